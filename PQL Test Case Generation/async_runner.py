@@ -0,0 +1,151 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+from batch_runner import DEFAULT_URL, RunStats, build_headers, response_record, result_record
+from catalog_io import write_jsonl
+from test_case import as_dict
+from transports import Transport, TransportError, make_transport
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit
+
+    Every healthy response grows the limit by ``increase / limit`` (about
+    ``increase`` per window of ``limit`` requests); a 429, 5xx, transport
+    error or a latency spike above ``spike_ratio`` times the smoothed healthy
+    latency multiplies it by ``backoff``. Only one decrease is applied per
+    round trip: responses to requests sent before the last decrease do not
+    cut the limit again.
+    """
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64, increase: float = 1.0,
+                 backoff: float = 0.5, spike_ratio: float = 3.0, smoothing: float = 0.1):
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.backoff = backoff
+        self.spike_ratio = spike_ratio
+        self.smoothing = smoothing
+        self.baseline = None
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.peak = self.limit
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the send time to pass to release()"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.perf_counter()
+
+    def _healthy(self, status_code: int, latency_ms: float) -> bool:
+        if status_code is None or status_code == 429 or status_code >= 500:
+            return False
+        return self.baseline is None or latency_ms <= self.spike_ratio * self.baseline
+
+    async def release(self, sent_at: float, status_code: int, latency_ms: float):
+        async with self._condition:
+            self.in_flight -= 1
+            if self._healthy(status_code, latency_ms):
+                if self.baseline is None:
+                    self.baseline = latency_ms
+                else:
+                    self.baseline += self.smoothing * (latency_ms - self.baseline)
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+                self.peak = max(self.peak, self.limit)
+            elif sent_at > self.last_decrease:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self.last_decrease = time.perf_counter()
+                self.decreases += 1
+            self._condition.notify_all()
+
+
+class AsyncRunner:
+    """Runs cases from an asyncio event loop with AIMD-controlled concurrency
+
+    Writes the same JSONL result lines as BatchRunner. Requests go through the
+    transport's ``apost``: natively async for the http2 and stub transports,
+    and on a thread pool sized to ``max_concurrency`` for pooled HTTP/1.1.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, headers: Dict[str, str] = None, concurrency: int = 8,
+                 max_concurrency: int = 64, timeout: float = 30, batch_size: int = 500,
+                 transport: Transport = None):
+        self.url = url
+        self.headers = headers if headers is not None else build_headers()
+        self.concurrency = max(1, concurrency)
+        self.max_concurrency = max(self.concurrency, max_concurrency)
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.transport = transport or make_transport("http1", self.max_concurrency)
+        self.limiter = None
+
+    async def _run_case(self, index: int, test_case: Any, sent_at: float) -> Dict[str, Any]:
+        record = None
+        try:
+            body = as_dict(test_case)["request_body"]
+            response = await self.transport.apost(self.url, self.headers, body, self.timeout)
+            record = response_record(index, test_case, response, (time.perf_counter() - sent_at) * 1000)
+        except TransportError as e:
+            record = result_record(index, test_case, None, (time.perf_counter() - sent_at) * 1000, error=str(e))
+        except Exception as e:
+            # A bug in a transport fails this case only, not the run and its unflushed results
+            record = result_record(index, test_case, None, (time.perf_counter() - sent_at) * 1000,
+                                   error=f"{type(e).__name__}: {e}")
+        finally:
+            # Cancellation still frees the slot (and counts as unhealthy)
+            await self.limiter.release(sent_at, record and record["status_code"],
+                                       record["response_time"] if record else 0.0)
+        return record
+
+    async def _run(self, test_cases: Iterable[Any], output: str, stats: RunStats):
+        self.limiter = AIMDLimiter(self.concurrency, maximum=self.max_concurrency)
+        batch: List[Dict[str, Any]] = []
+        write_jsonl([], output)
+
+        def collect(task: asyncio.Task):
+            if task.cancelled():
+                return
+            batch.append(task.result())
+            stats.add(batch[-1])
+            if len(batch) >= self.batch_size:
+                write_jsonl(batch, output, append=True)
+                batch.clear()
+
+        # Blocking transports run here, with a thread for every request the limiter may allow
+        executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="pql-async")
+        asyncio.get_running_loop().set_default_executor(executor)
+        try:
+            tasks = set()
+            for index, test_case in enumerate(test_cases):
+                sent_at = await self.limiter.acquire()
+                task = asyncio.create_task(self._run_case(index, test_case, sent_at))
+                task.add_done_callback(collect)
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            try:
+                await self.transport.aclose()
+            finally:
+                # Whatever completed is written, even if the run is aborted
+                write_jsonl(batch, output, append=True)
+
+    def run(self, test_cases: Iterable[Any], output: str) -> Dict[str, Any]:
+        """Run every case, writing one JSONL result line per case; returns the run summary"""
+        stats = RunStats()
+        asyncio.run(self._run(test_cases, output, stats))
+        stats.finished = time.perf_counter()
+        summary = stats.summary()
+        summary["concurrency"] = {
+            "final": round(self.limiter.limit, 1),
+            "peak": round(self.limiter.peak, 1),
+            "decreases": self.limiter.decreases,
+        }
+        return summary
@@ -0,0 +1,153 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator
+
+from catalog_io import write_jsonl
+from test_case import as_dict
+from transports import Transport, TransportError, make_transport
+
+DEFAULT_URL = "https://api.sikkasoft.com/v4/practice_query"
+# The practice_query key is read from the environment rather than kept in code
+REQUEST_KEY_ENV = "PQL_REQUEST_KEY"
+
+
+def build_headers(request_key: str = None) -> Dict[str, str]:
+    headers = {"Content-Type": "application/json"}
+    request_key = request_key or os.environ.get(REQUEST_KEY_ENV)
+    if request_key:
+        headers["Request-Key"] = request_key
+    return headers
+
+
+def result_record(index: int, test_case: Any, status_code: int = None, response_time: float = 0.0,
+                  data: Any = None, error: str = None) -> Dict[str, Any]:
+    """One JSONL result line; shared by every runner so their outputs are interchangeable"""
+    case = as_dict(test_case)
+    record = {
+        "index": index,
+        "api_name": case.get("api_name"),
+        "category": case.get("category"),
+        "test_case": case.get("test_case"),
+        "request_body": case["request_body"],
+        "success": error is None and status_code is not None and status_code < 400,
+        "status_code": status_code,
+        "response_time": round(response_time, 1),
+    }
+    if isinstance(data, dict):
+        record["total_count"] = data.get("total_count")
+        record["item_count"] = len(data["items"]) if isinstance(data.get("items"), list) else None
+        if status_code is not None and status_code >= 400:
+            error = error or data.get("long_message") or data.get("short_message")
+    record["error"] = error
+    return record
+
+
+class RunStats:
+    """Counters and latencies accumulated while results stream past"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.count = 0
+        self.succeeded = 0
+        self.status_counts = {}
+        self.latencies = []
+
+    def add(self, record: Dict[str, Any]):
+        self.count += 1
+        self.succeeded += record["success"]
+        status = record["status_code"] if record["status_code"] is not None else "error"
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.latencies.append(record["response_time"])
+
+    def track(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            self.add(record)
+            yield record
+        self.finished = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            "cases": self.count,
+            "succeeded": self.succeeded,
+            "failed": self.count - self.succeeded,
+            "status_counts": self.status_counts,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(self.count / elapsed, 1) if elapsed > 0 else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+        }
+
+
+def response_record(index: int, test_case: Any, response: Any, response_time: float) -> Dict[str, Any]:
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    return result_record(index, test_case, response.status_code, response_time, data)
+
+
+class BatchRunner:
+    """Runs cases against practice_query on a bounded thread pool sharing one transport
+
+    At most ``2 * concurrency`` cases are in flight or queued at once, so any
+    iterable (including lazy catalog readers) streams through in constant
+    memory. Results are yielded as they complete; ``index`` records each
+    case's position in the input. The default transport is a pooled HTTP/1.1
+    session with one keep-alive connection per worker.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, headers: Dict[str, str] = None, concurrency: int = 8,
+                 timeout: float = 30, transport: Transport = None):
+        self.url = url
+        self.headers = headers if headers is not None else build_headers()
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.transport = transport or make_transport("http1", self.concurrency)
+
+    def run_case(self, index: int, test_case: Any) -> Dict[str, Any]:
+        body = as_dict(test_case)["request_body"]
+        start = time.perf_counter()
+        try:
+            response = self.transport.post(self.url, self.headers, body, self.timeout)
+        except TransportError as e:
+            return result_record(index, test_case, None, (time.perf_counter() - start) * 1000, error=str(e))
+        except Exception as e:
+            # A bug in a transport fails this case only, not the run and its unflushed results
+            return result_record(index, test_case, None, (time.perf_counter() - start) * 1000,
+                                 error=f"{type(e).__name__}: {e}")
+        return response_record(index, test_case, response, (time.perf_counter() - start) * 1000)
+
+    def iter_results(self, test_cases: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="pql-runner") as pool:
+            pending = set()
+            for index, test_case in enumerate(test_cases):
+                if len(pending) >= 2 * self.concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(pool.submit(self.run_case, index, test_case))
+            for future in wait(pending).done:
+                yield future.result()
+
+    def run(self, test_cases: Iterable[Any], output: str) -> Dict[str, Any]:
+        """Run every case, writing one JSONL result line per case; returns the run summary"""
+        stats = RunStats()
+        write_jsonl(stats.track(self.iter_results(test_cases)), output)
+        return stats.summary()
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self) -> "BatchRunner":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator
+
+from transports import Transport, TransportError, TransportResponse
+
+MAGIC = b"PQLCAS1\n"
+# Trailer: index offset and index length, big-endian unsigned 64-bit
+_TRAILER = struct.Struct(">QQ")
+# Response headers that change on every call and only bloat a cassette
+VOLATILE_HEADERS = frozenset(("date", "set-cookie", "x-request-id", "x-amzn-requestid", "x-amzn-trace-id",
+                              "cf-ray", "age", "expires", "via", "x-cache", "connection", "keep-alive"))
+# Preset zlib dictionary of the text every entry repeats; entries are compressed
+# one by one, so without it each would pay for these strings again
+_ZDICT = (b'{"request":{"pql":"SELECT  FROM  WHERE  AND  ORDER BY  GROUP BY  LIMIT ","limit":50,"offset":0},'
+          b'"status_code":200,"headers":{"Content-Type":"application/json","Content-Length":"'
+          b'"},"body":"{\\"offset\\": \\"0\\", \\"limit\\": \\"50\\", \\"total_count\\": \\"'
+          b'\\", \\"execution_time\\": \\"\\", \\"pagination\\": {}, \\"items\\": [{\\"'
+          b'\\"}]}","elapsed_ms":')
+
+
+def _compress(data: Dict[str, Any]) -> bytes:
+    compressor = zlib.compressobj(9, zdict=_ZDICT)
+    return compressor.compress(json.dumps(data, separators=(",", ":")).encode("utf-8")) + compressor.flush()
+
+
+def _decompress(blob: bytes) -> Dict[str, Any]:
+    decompressor = zlib.decompressobj(zdict=_ZDICT)
+    return json.loads(decompressor.decompress(blob) + decompressor.flush())
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """Cassette index key: hash of the exact request body
+
+    Unlike the response cache, a cassette does not canonicalize PQL: queries
+    that are equivalent but spelled differently may get different responses
+    (row order, for one), and replay must reproduce each one as recorded.
+    """
+    data = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Cassette:
+    """Compressed record of request/response pairs with an index by request hash
+
+    File layout: a magic line, then one zlib-compressed JSON entry per
+    recorded request, then a compressed JSON index mapping request hash to
+    (offset, length) and a fixed-size trailer locating the index. Replay reads
+    the trailer and index only and fetches entries by seeking, so opening a
+    large cassette is cheap. Recording ("w", or "a" to add to an existing
+    cassette) writes to a temporary file that replaces the cassette on close,
+    so an interrupted recording leaves the previous cassette intact.
+    """
+
+    def __init__(self, path: str, mode: str = "r"):
+        if mode not in ("r", "w", "a"):
+            raise ValueError(f"Cassette mode must be 'r', 'w' or 'a', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.index = {}
+        self.meta = {}
+        self._lock = threading.Lock()
+        if mode == "r":
+            self.f = open(path, "rb")
+            try:
+                self._end = self._read_index(self.f)
+            except ValueError:
+                self.f.close()
+                raise
+            return
+        self._tmp_path = f"{path}.tmp"
+        existing = None
+        if mode == "a" and os.path.exists(path):
+            existing = open(path, "rb")
+        try:
+            # Entries of an existing cassette are copied over; its old index is rewritten on close
+            end = self._read_index(existing) if existing else len(MAGIC)
+            self.f = open(self._tmp_path, "w+b")
+            if existing:
+                existing.seek(0)
+                self._copy(existing, self.f, end)
+            else:
+                self.f.write(MAGIC)
+        finally:
+            if existing:
+                existing.close()
+        self._end = end
+
+    @staticmethod
+    def _copy(src, dst, length: int, chunk_size: int = 1 << 20):
+        while length > 0:
+            chunk = src.read(min(chunk_size, length))
+            if not chunk:
+                break
+            dst.write(chunk)
+            length -= len(chunk)
+
+    def _read_index(self, f) -> int:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a PQL cassette")
+        try:
+            f.seek(-_TRAILER.size, os.SEEK_END)
+            offset, length = _TRAILER.unpack(f.read(_TRAILER.size))
+            f.seek(offset)
+            data = _decompress(f.read(length))
+            self.meta = data.get("meta", {})
+            self.index = {key: (int(location[0]), int(location[1])) for key, location in data["entries"].items()}
+        except (OSError, struct.error, zlib.error, KeyError, TypeError, AttributeError, IndexError, ValueError) as e:
+            # Truncated or overwritten files end up here rather than as a traceback
+            raise ValueError(f"{self.path} has no readable index: {e!r}") from e
+        return offset
+
+    def record(self, body: Dict[str, Any], response: TransportResponse, elapsed_ms: float, url: str = None):
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in VOLATILE_HEADERS}
+        entry = {
+            "request": body,
+            "status_code": response.status_code,
+            "headers": headers,
+            "body": response.text,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        blob = _compress(entry)
+        with self._lock:
+            self.f.seek(self._end)
+            self.f.write(blob)
+            # A repeated request keeps its latest response
+            self.index[request_key(body)] = (self._end, len(blob))
+            self._end += len(blob)
+            if url and "url" not in self.meta:
+                self.meta["url"] = url
+
+    def get(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Recorded entry for a request body, or None"""
+        location = self.index.get(request_key(body))
+        if location is None:
+            return None
+        with self._lock:
+            self.f.seek(location[0])
+            blob = self.f.read(location[1])
+        return _decompress(blob)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for offset, length in list(self.index.values()):
+            with self._lock:
+                self.f.seek(offset)
+                blob = self.f.read(length)
+            yield _decompress(blob)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, body: Dict[str, Any]) -> bool:
+        return request_key(body) in self.index
+
+    def close(self):
+        if self.f.closed:
+            return
+        if self.mode == "r":
+            self.f.close()
+            return
+        with self._lock:
+            self.meta["recorded"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            payload = {"meta": self.meta, "entries": {key: list(loc) for key, loc in self.index.items()}}
+            index = _compress(payload)
+            self.f.seek(self._end)
+            self.f.write(index)
+            self.f.write(_TRAILER.pack(self._end, len(index)))
+            self.f.truncate()
+            self.f.close()
+            os.replace(self._tmp_path, self.path)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingTransport(Transport):
+    """Passes requests to ``inner`` and records every response with its latency"""
+
+    def __init__(self, inner: Transport, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.name = inner.name
+
+    def post(self, url, headers, body, timeout=30):
+        start = time.perf_counter()
+        response = self.inner.post(url, headers, body, timeout)
+        self.cassette.record(body, response, (time.perf_counter() - start) * 1000, url)
+        return response
+
+    async def apost(self, url, headers, body, timeout=30):
+        start = time.perf_counter()
+        response = await self.inner.apost(url, headers, body, timeout)
+        self.cassette.record(body, response, (time.perf_counter() - start) * 1000, url)
+        return response
+
+    def close(self):
+        self.inner.close()
+        self.cassette.close()
+
+    async def aclose(self):
+        await self.inner.aclose()
+        self.cassette.close()
+
+
+class ReplayTransport(Transport):
+    """Serves responses from a cassette, instantly or after each entry's recorded latency
+
+    Requests that were never recorded fail with TransportError, so gaps in a
+    cassette show up as errors in the results instead of silent live calls.
+    """
+    name = "replay"
+
+    def __init__(self, cassette: Cassette, realtime: bool = False):
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def _lookup(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self.cassette.get(body)
+        if entry is None:
+            raise TransportError(f"No recorded response in {self.cassette.path} for this request")
+        return entry
+
+    @staticmethod
+    def _response(entry: Dict[str, Any]) -> TransportResponse:
+        return TransportResponse(entry["status_code"], entry["headers"], entry["body"])
+
+    def post(self, url, headers, body, timeout=30):
+        entry = self._lookup(body)
+        if self.realtime:
+            time.sleep(entry["elapsed_ms"] / 1000)
+        return self._response(entry)
+
+    async def apost(self, url, headers, body, timeout=30):
+        entry = self._lookup(body)
+        if self.realtime:
+            await asyncio.sleep(entry["elapsed_ms"] / 1000)
+        return self._response(entry)
+
+    def close(self):
+        self.cassette.close()
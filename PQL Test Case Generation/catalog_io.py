@@ -0,0 +1,234 @@
+import gzip
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator
+
+from test_case import DEFAULT_PAGE, TestCase, as_dict
+
+
+def open_catalog(filename: str, mode: str = "rt", compress: bool = None):
+    """Open a catalog file as text, transparently handling gzip"""
+    if compress is None:
+        compress = filename.endswith(".gz")
+    if compress:
+        return gzip.open(filename, mode, encoding="utf-8")
+    return open(filename, mode, encoding="utf-8")
+
+
+def write_jsonl(test_cases: Iterable[Dict], filename: str, compress: bool = None,
+                batch_size: int = 500, append: bool = False) -> int:
+    """Stream test cases to a JSONL file, one compact JSON object per line
+
+    Cases are consumed lazily and written in batches of ``batch_size`` lines,
+    so memory stays bounded regardless of catalog size. TestCase records are
+    serialized with their api_name and category; plain dicts are written as
+    they are. Gzip is used when ``compress`` is true or the filename ends
+    with ``.gz``. Returns the number of cases written.
+    """
+    written = 0
+    batch = []
+    with open_catalog(filename, "at" if append else "wt", compress) as f:
+        try:
+            for test_case in test_cases:
+                batch.append(json.dumps(as_dict(test_case), separators=(",", ":")) + "\n")
+                if len(batch) >= batch_size:
+                    f.writelines(batch)
+                    written += len(batch)
+                    batch = []
+        finally:
+            # Lines already produced survive an exception from the source iterator
+            if batch:
+                f.writelines(batch)
+                written += len(batch)
+    return written
+
+
+def read_jsonl(filename: str) -> Iterable[Dict]:
+    """Lazily read cases back from a (possibly gzipped) JSONL catalog"""
+    with open_catalog(filename, "rt") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class _JSONStream:
+    """Incremental reader over a JSON document: decodes one value at a time from a buffered file"""
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append the next chunk, discarding consumed text; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed), or '' at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and not isinstance(value, (dict, list, str)):
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        """Yield the items of the array starting at the current position, one at a time"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+
+
+_FROM_RE = re.compile(r"\bFROM\s+\[(\w+)\]", re.IGNORECASE)
+
+# Checked in order against the upper-cased PQL; the first match wins
+_CATEGORY_PATTERNS = [
+    ("union", re.compile(r"\bUNION\b")),
+    ("subquery", re.compile(r"\bEXISTS\b|\(\s*SELECT\b")),
+    ("join", re.compile(r"\bJOIN\b")),
+    ("group_by_having", re.compile(r"\bGROUP\s+BY\b|\bHAVING\b")),
+    ("like", re.compile(r"\bLIKE\b")),
+    ("aggregation", re.compile(r"\b(COUNT|SUM|AVG|MIN|MAX)\s*\(")),
+    ("where_clause", re.compile(r"\bWHERE\b")),
+]
+
+
+def infer_category(pql: str) -> str:
+    """Best-effort test case category for a query from a file that does not record one"""
+    upper = pql.upper()
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(upper):
+            return category
+    return "basic_select"
+
+
+def normalize_case(record: Any, api_name: str = None) -> TestCase:
+    """Normalize any known case shape into a TestCase
+
+    Accepts TestCase records, catalog dicts (``test_case``/``request_body``,
+    optionally with ``api_name``/``category``) and the legacy
+    ``Test Case ID``/``Test Description``/``Request Body`` records.
+    """
+    if isinstance(record, TestCase):
+        return record
+    if "request_body" in record:
+        body, description = record["request_body"], record.get("test_case", "")
+    elif "Request Body" in record:
+        body = record["Request Body"]
+        description = record.get("Test Description") or record.get("Test Case ID", "")
+    else:
+        raise ValueError(f"Unrecognized test case record with keys: {', '.join(record)}")
+    pql = body["pql"]
+    api = record.get("api_name") or api_name
+    if not api:
+        match = _FROM_RE.search(pql)
+        api = match.group(1) if match else ""
+    category = record.get("category") or infer_category(pql)
+    page = (str(body.get("limit", DEFAULT_PAGE[0])), str(body.get("offset", DEFAULT_PAGE[1])))
+    return TestCase(api, category, description, pql, None, DEFAULT_PAGE if page == DEFAULT_PAGE else page)
+
+
+def _is_jsonl(filename: str) -> bool:
+    """True when the file's first non-blank line is a complete JSON object that is not a test_cases document"""
+    with open_catalog(filename, "rt") as f:
+        for line in f:
+            if line.strip():
+                break
+        else:
+            return False
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(record, dict) and "test_cases" not in record
+
+
+def iter_cases(filename: str) -> Iterator[TestCase]:
+    """Stream normalized TestCase records from any case file this repo produces
+
+    Supports JSONL catalogs (optionally gzipped), the ``{"api_name", "test_cases": [...]}``
+    files written by save_test_cases_to_file and the legacy ``pql_test_cases*.json``
+    arrays. The format is detected from the content, not the file name. JSON
+    documents are parsed incrementally, one case at a time, so memory does not
+    grow with file size; an object without a ``test_cases`` list or content
+    after the document raises ValueError.
+    """
+    if _is_jsonl(filename):
+        for record in read_jsonl(filename):
+            yield normalize_case(record)
+        return
+
+    with open_catalog(filename, "rt") as f:
+        stream = _JSONStream(f)
+        first = stream.peek()
+        if first == "[":
+            for record in stream.array_items():
+                yield normalize_case(record)
+        elif first == "{":
+            stream.expect("{")
+            api_name = None
+            found = False
+            while stream.peek() != "}":
+                key = stream.value()
+                stream.expect(":")
+                if key == "test_cases" and stream.peek() == "[":
+                    found = True
+                    for record in stream.array_items():
+                        yield normalize_case(record, api_name)
+                else:
+                    value = stream.value()
+                    if key == "api_name":
+                        api_name = value
+                if stream.peek() == ",":
+                    stream.pos += 1
+            stream.pos += 1
+            if not found:
+                raise ValueError(f"{filename} is a JSON object without a test_cases list")
+        elif first:
+            raise ValueError(f"{filename} is not a JSON case file")
+        if stream.peek():
+            raise ValueError(f"{filename} has unexpected content after the JSON document")
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+
+MANIFEST_NAME = "manifest.json"
+
+
+def fingerprint(value: Any) -> str:
+    """Stable content hash of any JSON-serializable value"""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """Content hash of a file, used to version the generator code"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def files_fingerprint(paths: List[str]) -> str:
+    """Content hash of several files, in the given order"""
+    return fingerprint([file_fingerprint(path) for path in paths])
+
+
+def manifest_path(shard_dir: str) -> str:
+    return os.path.join(shard_dir, MANIFEST_NAME)
+
+
+def load_manifest(shard_dir: str) -> Dict[str, Any]:
+    """Read the shard manifest, or an empty one if missing or unreadable"""
+    try:
+        with open(manifest_path(shard_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"generator_version": None, "categories": None, "apis": {}}
+
+
+def save_manifest(shard_dir: str, manifest: Dict[str, Any]):
+    """Atomically write the shard manifest"""
+    path = manifest_path(shard_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def diff_fields(old_fields: List[str], new_fields: List[str]) -> Dict[str, List[str]]:
+    """Fields added to and removed from an API, in schema order"""
+    old_set, new_set = set(old_fields), set(new_fields)
+    return {
+        "added_fields": [field for field in new_fields if field not in old_set],
+        "removed_fields": [field for field in old_fields if field not in new_set],
+    }
@@ -0,0 +1,158 @@
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pql_canon import case_hash
+from test_case import TestCase, as_dict
+
+DEFAULT_DB = "pql_catalog.db"
+
+# [api.field] references in PQL text
+FIELD_REF_RE = re.compile(r"\[([^\[\].]+)\.([^\[\]]+)\]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    api TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL,
+    pql TEXT NOT NULL,
+    page_limit TEXT NOT NULL,
+    page_offset TEXT NOT NULL,
+    case_hash TEXT NOT NULL,
+    UNIQUE (case_hash, description)
+);
+CREATE INDEX IF NOT EXISTS idx_cases_api_category ON cases (api, category);
+CREATE INDEX IF NOT EXISTS idx_cases_category ON cases (category);
+CREATE TABLE IF NOT EXISTS case_fields (
+    field TEXT NOT NULL,
+    api TEXT NOT NULL,
+    case_id INTEGER NOT NULL REFERENCES cases (id),
+    PRIMARY KEY (field, api, case_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_case_fields_case ON case_fields (case_id);
+"""
+
+# Keep identifiers such as guarantor_id as single tokens
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+    pql, content='cases', content_rowid='id', tokenize="unicode61 tokenchars '_'"
+);
+"""
+
+
+def is_catalog_db(path: str) -> bool:
+    """Whether a file is an SQLite database (a CatalogStore) rather than a case file"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(16) == b"SQLite format 3\x00"
+    except OSError:
+        return False
+
+
+def fields_used(pql: str) -> List[Tuple[str, str]]:
+    """Distinct (api, field) references in a query, in order of appearance"""
+    return list(dict.fromkeys(FIELD_REF_RE.findall(pql)))
+
+
+class CatalogStore:
+    """SQLite-backed test case catalog indexed by API, category, fields used and PQL text"""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: text search falls back to LIKE
+            self.has_fts = False
+
+    def __enter__(self) -> "CatalogStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add_cases(self, test_cases: Iterable[Any]) -> int:
+        """Bulk-insert cases (TestCase records or catalog dicts) in one transaction
+
+        Cases already stored (same canonical request and description) are
+        skipped. Returns the number of new cases.
+        """
+        inserted = 0
+        with self.conn:
+            cursor = self.conn.cursor()
+            for test_case in test_cases:
+                case = as_dict(test_case)
+                body = case["request_body"]
+                cursor.execute(
+                    "INSERT OR IGNORE INTO cases (api, category, description, pql, page_limit, page_offset, case_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (case.get("api_name", ""), case.get("category", ""), case["test_case"], body["pql"],
+                     str(body.get("limit", "")), str(body.get("offset", "")), case_hash(case))
+                )
+                if cursor.rowcount != 1:
+                    continue
+                case_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO case_fields (field, api, case_id) VALUES (?, ?, ?)",
+                    [(field, api, case_id) for api, field in fields_used(body["pql"])]
+                )
+                if self.has_fts:
+                    cursor.execute("INSERT INTO cases_fts (rowid, pql) VALUES (?, ?)", (case_id, body["pql"]))
+                inserted += 1
+        return inserted
+
+    def _where(self, api: str = None, category: str = None, field: str = None,
+               match: str = None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if api is not None:
+            clauses.append("c.api = ?")
+            params.append(api)
+        if category is not None:
+            clauses.append("c.category = ?")
+            params.append(category)
+        if field is not None:
+            clauses.append("c.id IN (SELECT case_id FROM case_fields WHERE field = ?)")
+            params.append(field)
+        if match is not None:
+            if self.has_fts:
+                clauses.append("c.id IN (SELECT rowid FROM cases_fts WHERE cases_fts MATCH ?)")
+            else:
+                clauses.append("c.pql LIKE '%' || ? || '%'")
+            params.append(match)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def select(self, api: str = None, category: str = None, field: str = None, match: str = None,
+               limit: int = None) -> List[TestCase]:
+        """Cases matching every given filter, in insertion order
+
+        ``field`` matches cases referencing that field on any API; ``match`` is an
+        FTS5 query over the PQL text (e.g. ``HAVING`` or ``"guarantor_id"``).
+        """
+        where, params = self._where(api, category, field, match)
+        sql = ("SELECT c.api, c.category, c.description, c.pql, c.page_limit, c.page_offset "
+               f"FROM cases c{where} ORDER BY c.id")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [TestCase(api_name, case_category, description, pql, None, (page_limit, page_offset))
+                for api_name, case_category, description, pql, page_limit, page_offset
+                in self.conn.execute(sql, params)]
+
+    def count(self, api: str = None, category: str = None, field: str = None, match: str = None) -> int:
+        where, params = self._where(api, category, field, match)
+        return self.conn.execute(f"SELECT COUNT(*) FROM cases c{where}", params).fetchone()[0]
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Case counts per API and category"""
+        result = {}
+        for api, category, n in self.conn.execute(
+                "SELECT api, category, COUNT(*) FROM cases GROUP BY api, category ORDER BY api, category"):
+            result.setdefault(api, {})[category] = n
+        return result
@@ -0,0 +1,130 @@
+import heapq
+from typing import Any, Dict, Iterable, List, Tuple
+
+from catalog_store import fields_used
+from schema_registry import SchemaRegistry
+from test_case import as_dict
+
+
+class FieldCoverage:
+    """Per-API field coverage of a suite, kept as one integer bitset per API
+
+    Bit ``i`` of an API's bitset is set once any case references the API's
+    ``i``-th schema field as ``[api.field]``. References to fields outside the
+    schema are counted separately as unknown.
+    """
+
+    def __init__(self, registry: SchemaRegistry):
+        self.registry = registry
+        # API -> field -> bit position, in schema order (duplicate schema fields share one bit)
+        self.bit_index = {record.name: {field: bit for bit, field in enumerate(dict.fromkeys(record.fields))}
+                          for record in registry}
+        self.covered = dict.fromkeys(self.bit_index, 0)
+        self.categories = {}
+        self.unknown = {}
+        self.cases = 0
+
+    def case_mask(self, test_case: Any) -> Dict[str, int]:
+        """Fields a single case exercises, as API -> bitset"""
+        masks = {}
+        for api, field in fields_used(as_dict(test_case)["request_body"]["pql"]):
+            bit = self.bit_index.get(api, {}).get(field)
+            if bit is not None:
+                masks[api] = masks.get(api, 0) | (1 << bit)
+        return masks
+
+    def add(self, test_case: Any):
+        case = as_dict(test_case)
+        for api, field in fields_used(case["request_body"]["pql"]):
+            bit = self.bit_index.get(api, {}).get(field)
+            if bit is None:
+                self.unknown.setdefault(api, set()).add(field)
+            else:
+                self.covered[api] |= 1 << bit
+        api_name = case.get("api_name")
+        if api_name:
+            self.categories.setdefault(api_name, set()).add(case.get("category", ""))
+        self.cases += 1
+
+    def update(self, test_cases: Iterable[Any]) -> "FieldCoverage":
+        for test_case in test_cases:
+            self.add(test_case)
+        return self
+
+    def covered_fields(self, api_name: str) -> List[str]:
+        mask = self.covered.get(api_name, 0)
+        return [field for field, bit in self.bit_index.get(api_name, {}).items() if mask >> bit & 1]
+
+    def missing_fields(self, api_name: str) -> List[str]:
+        mask = self.covered.get(api_name, 0)
+        return [field for field, bit in self.bit_index.get(api_name, {}).items() if not mask >> bit & 1]
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-API covered/total field counts, missing fields and categories seen"""
+        result = {}
+        for api_name, mask in self.covered.items():
+            total = len(self.bit_index[api_name])
+            covered = mask.bit_count()
+            result[api_name] = {
+                "covered": covered,
+                "total": total,
+                "percent": round(100.0 * covered / total, 1) if total else 100.0,
+                "missing_fields": self.missing_fields(api_name),
+                "categories": sorted(self.categories.get(api_name, ())),
+            }
+        return result
+
+    def totals(self) -> Tuple[int, int]:
+        """(covered, total) fields across every API"""
+        covered = sum(mask.bit_count() for mask in self.covered.values())
+        total = sum(len(fields) for fields in self.bit_index.values())
+        return covered, total
+
+
+def minimize_suite(test_cases: Iterable[Any], registry: SchemaRegistry,
+                   categories: bool = True) -> List[Any]:
+    """Greedy set cover: a small subset of cases with the same field (and category) coverage
+
+    The universe is every schema field referenced anywhere in ``test_cases``,
+    plus every (API, category) pair when ``categories`` is true. Each case is a
+    single integer bitset over that universe; cases are picked by largest
+    number of newly covered elements using lazy gain evaluation (gains only
+    shrink, so stale heap entries are re-scored on pop). Ties go to the
+    earliest case, which keeps the result deterministic. Returns the chosen
+    cases in their original order.
+    """
+    coverage = FieldCoverage(registry)
+    offsets, offset = {}, 0
+    for api_name, bits in coverage.bit_index.items():
+        offsets[api_name] = offset
+        offset += len(bits)
+    category_bits = {}
+
+    cases, masks = [], []
+    for test_case in test_cases:
+        mask = 0
+        for api_name, api_mask in coverage.case_mask(test_case).items():
+            mask |= api_mask << offsets[api_name]
+        if categories:
+            key = (test_case.get("api_name", ""), test_case.get("category", ""))
+            if key not in category_bits:
+                category_bits[key] = offset + len(category_bits)
+            mask |= 1 << category_bits[key]
+        if mask:
+            cases.append(test_case)
+            masks.append(mask)
+
+    heap = [(-mask.bit_count(), index) for index, mask in enumerate(masks)]
+    heapq.heapify(heap)
+    covered, chosen = 0, []
+    while heap:
+        neg_gain, index = heapq.heappop(heap)
+        gain = (masks[index] & ~covered).bit_count()
+        if gain == 0:
+            continue
+        if gain != -neg_gain:
+            heapq.heappush(heap, (-gain, index))
+            continue
+        covered |= masks[index]
+        chosen.append(index)
+    return [cases[index] for index in sorted(chosen)]
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Tenancy columns carried by nearly every API; joining on them relates everything
+# to everything, so they are left out of the graph unless requested explicitly
+TENANT_KEYS = ("practice_id", "cust_id")
+
+
+class JoinGraph:
+    """Graph of APIs connected by shared key fields, for multi-way join enumeration
+
+    Keys are looked up in ``field_index`` (field -> APIs, such as
+    SchemaRegistry.field_index) when given, else in an index built from ``api_map``.
+    """
+
+    def __init__(self, api_map: Dict[str, List[str]], keys: Iterable[str] = None,
+                 exclude_keys: Iterable[str] = TENANT_KEYS, field_index: Dict[str, Iterable[str]] = None):
+        self.api_map = api_map
+        self.order = {api_name: i for i, api_name in enumerate(api_map)}
+
+        key_index = field_index
+        if key_index is None:
+            key_index = {}
+            for api_name, fields in api_map.items():
+                for field in dict.fromkeys(fields):
+                    key_index.setdefault(field, []).append(api_name)
+
+        if keys is None:
+            excluded = set(exclude_keys or ())
+            keys = [field for field, apis in key_index.items()
+                    if field.endswith("_id") and len(apis) > 1 and field not in excluded]
+        # Most selective keys first so the cheapest joins are enumerated first
+        self.keys = sorted((key for key in keys if len(key_index.get(key, [])) > 1),
+                           key=lambda key: (len(key_index[key]), key))
+
+        # adjacency[api] is a list of (neighbor, key) edges in deterministic order
+        self.adjacency = {api_name: [] for api_name in api_map}
+        for key in self.keys:
+            apis = key_index[key]
+            for api_name in apis:
+                self.adjacency[api_name].extend((other, key) for other in apis if other != api_name)
+
+    def neighbors(self, api_name: str) -> List[Tuple[str, str]]:
+        """(neighbor, key) edges of an API"""
+        return self.adjacency.get(api_name, [])
+
+    def edge_count(self) -> int:
+        """Number of undirected (api, api, key) edges"""
+        return sum(len(edges) for edges in self.adjacency.values()) // 2
+
+    def iter_paths(self, depth: int = 2, start: str = None, max_paths: int = None) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """Enumerate join paths with 1..depth joins, shortest first
+
+        Yields ``(apis, keys)`` where ``keys[i]`` joins ``apis[i]`` to
+        ``apis[i + 1]``. Paths never revisit an API and never use the same
+        key on two consecutive hops (that is a star on one key, already
+        covered by the shorter paths). Without ``start``, only one direction
+        of each path is emitted. Enumeration stops after ``max_paths``.
+
+        Each path length is an iterative depth-first pass per start API
+        (iterative deepening), so memory grows with ``depth``, not with the
+        number of paths, and paths come out in breadth-first order.
+        """
+        starts = [start] if start is not None else [api_name for api_name in self.api_map
+                                                    if self.adjacency.get(api_name)]
+        emitted = 0
+        for length in range(1, depth + 1):
+            for first in starts:
+                for path in self._paths_from(first, length, both_directions=start is not None):
+                    yield path
+                    emitted += 1
+                    if max_paths is not None and emitted >= max_paths:
+                        return
+
+    def _paths_from(self, first: str, length: int,
+                    both_directions: bool) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """Depth-first paths of exactly ``length`` joins from ``first``, in adjacency order"""
+        if first not in self.adjacency:
+            return
+        apis, keys = [first], []
+        # One edge iterator per API on the current path
+        stack = [iter(self.adjacency[first])]
+        while stack:
+            for other, key in stack[-1]:
+                if other in apis or (keys and key == keys[-1]):
+                    continue
+                if len(keys) + 1 == length:
+                    # Complete path: keep one direction unless a start was given
+                    if both_directions or self.order[first] < self.order[other]:
+                        yield tuple(apis) + (other,), tuple(keys) + (key,)
+                    continue
+                apis.append(other)
+                keys.append(key)
+                stack.append(iter(self.adjacency[other]))
+                break
+            else:
+                stack.pop()
+                if stack:
+                    apis.pop()
+                    keys.pop()
+
+    def path_to_pql(self, apis: Tuple[str, ...], keys: Tuple[str, ...]) -> str:
+        """Render a join path as a chained multi-way LEFT JOIN query"""
+        projection = ", ".join(f"[{api_name}.{self.api_map[api_name][0]}]" for api_name in apis)
+        joins = " ".join(
+            f"LEFT JOIN [{right}] ON [{left}.{key}] = [{right}.{key}]"
+            for left, right, key in zip(apis, apis[1:], keys)
+        )
+        return f"SELECT {projection} FROM [{apis[0]}] {joins}"
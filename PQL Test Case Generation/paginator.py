@@ -0,0 +1,113 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Any, Dict, Iterator
+
+from transports import Transport
+
+
+class PageError(Exception):
+    """A page request came back with a non-2xx status or a body without items"""
+
+    def __init__(self, message: str, offset: int, status_code: int = None):
+        super().__init__(message)
+        self.offset = offset
+        self.status_code = status_code
+
+
+def _total_count(payload: Dict[str, Any]) -> int:
+    # practice_query returns counts as strings; a missing or odd value means "unknown"
+    try:
+        return int(payload["total_count"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def fetch_page(transport: Transport, url: str, headers: Dict[str, str], body: Dict[str, Any], offset: int,
+               timeout: float = 30) -> Dict[str, Any]:
+    """One page of a query: ``body`` with its offset replaced; raises PageError on a failed page"""
+    page_body = dict(body, offset=str(offset))
+    response = transport.post(url, headers, page_body, timeout)
+    if not 200 <= response.status_code < 300:
+        raise PageError(f"Page at offset {offset} failed with HTTP {response.status_code}: {response.text[:200]}",
+                        offset, response.status_code)
+    try:
+        payload = response.json()
+    except ValueError as e:
+        raise PageError(f"Page at offset {offset} is not JSON: {e}", offset, response.status_code) from e
+    if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+        raise PageError(f"Page at offset {offset} has no items list", offset, response.status_code)
+    return payload
+
+
+def iter_pages(transport: Transport, url: str, headers: Dict[str, str], body: Dict[str, Any], prefetch: int = 4,
+               timeout: float = 30) -> Iterator[Dict[str, Any]]:
+    """Yield every page of a query in order, fetching up to ``prefetch`` pages ahead
+
+    The first page (at the body's offset, usually 0) gives ``total_count``
+    and the page size: the number of rows the server actually returned,
+    which may be fewer than ``limit`` if it caps pages. The remaining offsets
+    are requested ``prefetch`` at a time on a thread pool while the caller
+    consumes earlier pages, so a result of N rows takes about
+    N / (page size * prefetch) round trips. At most ``prefetch`` pages are
+    held in memory besides the one being consumed.
+
+    With a known total_count, a page that returns fewer rows than its share
+    of the total raises PageError instead of silently skipping rows. Without
+    one, pages are fetched until one comes back short.
+
+    The transport must allow ``prefetch`` concurrent requests (size its
+    connection pool accordingly). Closing the iterator early cancels the
+    pages still queued.
+    """
+    prefetch = max(1, prefetch)
+    start = int(body.get("offset", 0))
+    first = fetch_page(transport, url, headers, body, start, timeout)
+    yield first
+    total = _total_count(first)
+    page_size = len(first["items"])
+    if not page_size or (total is not None and start + page_size >= total):
+        return
+    offsets = iter(range(start + page_size, total, page_size) if total is not None
+                   else count(start + page_size, page_size))
+
+    executor = ThreadPoolExecutor(prefetch, thread_name_prefix="pql-page")
+    window = deque()
+
+    def submit_next() -> bool:
+        offset = next(offsets, None)
+        if offset is None:
+            return False
+        window.append((offset, executor.submit(fetch_page, transport, url, headers, body, offset, timeout)))
+        return True
+
+    try:
+        while len(window) < prefetch and submit_next():
+            pass
+        while window:
+            offset, future = window.popleft()
+            page = future.result()
+            rows = len(page["items"])
+            if total is not None:
+                expected = min(page_size, total - offset)
+                if rows < expected:
+                    raise PageError(f"Page at offset {offset} returned {rows} rows, expected {expected}; "
+                                    f"rows would be skipped", offset)
+            elif not rows:
+                return
+            yield page
+            # The end of an unknown-size result
+            if total is None and rows < page_size:
+                return
+            submit_next()
+    finally:
+        for _, future in window:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_items(transport: Transport, url: str, headers: Dict[str, str], body: Dict[str, Any], prefetch: int = 4,
+               timeout: float = 30) -> Iterator[Dict[str, Any]]:
+    """Yield every row of a query across all pages (see iter_pages)"""
+    for page in iter_pages(transport, url, headers, body, prefetch, timeout):
+        yield from page["items"]
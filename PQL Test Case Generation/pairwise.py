@@ -0,0 +1,71 @@
+import random
+from itertools import combinations
+from typing import Any, Dict, List, Sequence
+
+
+def pairwise_cover(dimensions: Dict[str, Sequence], seed: int = 0, candidates: int = 5) -> List[Dict[str, Any]]:
+    """Build a small set of rows covering every pair of values across dimensions
+
+    Greedy AETG-style construction: each new row starts from an uncovered value
+    pair of the dimension pair with the most uncovered pairs left, then fills
+    the remaining dimensions one at a time with the value that covers the most
+    new pairs. ``candidates`` rows are tried per step and the best one kept.
+    The result is fully determined by ``seed``.
+    """
+    names = list(dimensions)
+    values = [list(dimensions[name]) for name in names]
+    if not names or any(not v for v in values):
+        return []
+    if len(names) == 1:
+        return [{names[0]: value} for value in values[0]]
+
+    rng = random.Random(seed)
+    uncovered = {
+        (p, q): {(i, j) for i in range(len(values[p])) for j in range(len(values[q]))}
+        for p, q in combinations(range(len(names)), 2)
+    }
+    remaining = sum(len(pairs) for pairs in uncovered.values())
+
+    def gain(row: Dict[int, int]) -> int:
+        return sum((row[p], row[q]) in uncovered[(p, q)] for p, q in uncovered)
+
+    rows = []
+    while remaining:
+        p, q = max(uncovered, key=lambda pq: len(uncovered[pq]))
+        start = rng.choice(sorted(uncovered[(p, q)]))
+        best_row, best_gain = None, -1
+        for _ in range(candidates):
+            row = {p: start[0], q: start[1]}
+            others = [r for r in range(len(names)) if r not in row]
+            rng.shuffle(others)
+            for r in others:
+                scores = []
+                for v in range(len(values[r])):
+                    score = 0
+                    for a, i in row.items():
+                        pair_key, pair = ((a, r), (i, v)) if a < r else ((r, a), (v, i))
+                        score += pair in uncovered[pair_key]
+                    scores.append(score)
+                top = max(scores)
+                row[r] = rng.choice([v for v, score in enumerate(scores) if score == top])
+            row_gain = gain(row)
+            if row_gain > best_gain:
+                best_row, best_gain = row, row_gain
+        for a, b in uncovered:
+            pair = (best_row[a], best_row[b])
+            if pair in uncovered[(a, b)]:
+                uncovered[(a, b)].discard(pair)
+                remaining -= 1
+        rows.append(best_row)
+
+    return [{names[k]: values[k][row[k]] for k in range(len(names))} for row in rows]
+
+
+def uncovered_pairs(dimensions: Dict[str, Sequence], rows: List[Dict[str, Any]]) -> List[tuple]:
+    """List the ((dimension, value), (dimension, value)) pairs the rows do not cover"""
+    names = list(dimensions)
+    seen = {(a, b, row[a], row[b]) for row in rows for a, b in combinations(names, 2)}
+    return [((a, va), (b, vb))
+            for a, b in combinations(names, 2)
+            for va in dimensions[a] for vb in dimensions[b]
+            if (a, b, va, vb) not in seen]
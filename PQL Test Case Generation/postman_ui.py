@@ -1,9 +1,18 @@
+import os
+import csv
+import io
 import streamlit as st
-import requests
 import json
 import pandas as pd
 from datetime import datetime
-from testgeneration import PQLTestGenerator, API_SCHEMA
+from testgeneration import PQLTestGenerator
+from schema_registry import get_registry
+from catalog_store import CatalogStore, DEFAULT_DB
+from pql_parser import PQLValidator
+from transports import TRANSPORTS, TransportError, make_transport
+from response_cache import CACHE_HEADER, DEFAULT_CACHE_DB, CachingTransport, ResponseCache
+from cassette import Cassette, ReplayTransport
+from paginator import PageError, iter_pages
 
 # Configure the page
 st.set_page_config(
@@ -81,7 +90,20 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 class PostmanAPITester:
-    def __init__(self):
+    def __init__(self, transport_name="http1", cache=None, cassette=None, realtime=False):
+        # Pooled HTTP/1.1 by default; "http2" multiplexes on one connection, "stub" answers in-process
+        self.transport_name = transport_name
+        self.cache = cache
+        if cassette is not None:
+            # Recorded responses only; the network and the cache are not touched
+            self.transport_name = "replay"
+            self.transport = ReplayTransport(cassette, realtime=realtime)
+            self.cache = None
+        else:
+            self.transport = make_transport(transport_name, pool_size=4)
+            # Optional on-disk response cache in front of the transport
+            if cache is not None:
+                self.transport = CachingTransport(self.transport, cache)
         self.base_url = "https://api.sikkasoft.com/v4/practice_query"
         self.default_headers = {
             "Request-Key": "fd34a6e6b28b2a272eef19682e6c428d",
@@ -97,17 +119,13 @@ class PostmanAPITester:
         """Execute the API request"""
         try:
             start_time = datetime.now()
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=body,
-                timeout=30
-            )
+            response = self.transport.post(self.base_url, headers, body, timeout=30)
             end_time = datetime.now()
             response_time = (end_time - start_time).total_seconds() * 1000
             
             result = {
                 "success": True,
+                "cached": response.headers.get(CACHE_HEADER) == "HIT",
                 "status_code": response.status_code,
                 "response_time": response_time,
                 "headers": dict(response.headers),
@@ -121,13 +139,29 @@ class PostmanAPITester:
                 
             return result
             
-        except requests.exceptions.RequestException as e:
+        except TransportError as e:
             return {
                 "success": False,
                 "error": str(e),
                 "status_code": None,
                 "response_time": 0
             }
+    
+    def fetch_all_csv(self, headers, body, progress=None, prefetch=4):
+        """Every row of the query as CSV text; pages are prefetched ``prefetch`` at a time (the pool size)"""
+        out = io.StringIO()
+        writer = None
+        rows = 0
+        for page in iter_pages(self.transport, self.base_url, headers, body, prefetch=prefetch):
+            if writer is None:
+                columns = list(page["items"][0]) if page["items"] else []
+                writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+                writer.writeheader()
+            writer.writerows(page["items"])
+            rows += len(page["items"])
+            if progress is not None:
+                progress(rows, page.get("total_count"))
+        return out.getvalue(), rows
 
 def format_json(data):
     """Format JSON with proper indentation"""
@@ -136,21 +170,35 @@ def format_json(data):
     except:
         return str(data)
 
+def show_pql_issues(pql):
+    """Check PQL locally against the schema; returns True when it has no errors"""
+    issues = PQLValidator(get_registry()).validate(pql)
+    for issue in issues:
+        report = st.error if issue.severity == "error" else st.warning
+        report(f"PQL {issue.severity}: {issue.message} (position {issue.pos})")
+        st.code(f"{pql}\n{' ' * issue.pos}^", language="sql")
+    return not any(issue.severity == "error" for issue in issues)
+
 def create_test_cases_tab():
     """Create the Test Cases tab content"""
     st.markdown("### 🧪 PQL Test Case Generator")
     st.markdown("Generate comprehensive test cases for different APIs")
     
-    # Initialize test generator
-    test_generator = PQLTestGenerator(API_SCHEMA)
+    # Shared schema registry, rebuilt only when api_data.py changes
+    registry = get_registry()
     
     # API Selection
-    available_apis = list(test_generator.api_map.keys())
+    available_apis = registry.api_names()
     selected_api = st.selectbox("Select API", available_apis, key="api_selector")
     
     if selected_api:
         # Generate test cases
         with st.spinner("Generating test cases..."):
+            # Keep one generator per session so its memoized suites survive reruns
+            test_generator = st.session_state.get("test_generator")
+            if test_generator is None or test_generator.registry is not registry:
+                test_generator = PQLTestGenerator(registry)
+                st.session_state.test_generator = test_generator
             test_cases = test_generator.generate_all_test_cases(selected_api)
         
         # Display test cases count
@@ -158,7 +206,7 @@ def create_test_cases_tab():
         with col1:
             st.metric("Total Test Cases", len(test_cases))
         with col2:
-            st.metric("API Fields", len(test_generator.get_api_fields(selected_api)))
+            st.metric("API Fields", len(registry.fields(selected_api)))
         with col3:
             st.metric("API Selected", selected_api)
         
@@ -184,7 +232,7 @@ def create_test_cases_tab():
             test_cases_json = json.dumps({
                 "api_name": selected_api,
                 "total_test_cases": len(test_cases),
-                "test_cases": test_cases
+                "test_cases": [test_case.to_dict() for test_case in test_cases]
             }, indent=2)
             
             st.download_button(
@@ -196,9 +244,70 @@ def create_test_cases_tab():
             )
         else:
             st.warning(f"No test cases generated for {selected_api}. Check if the API has valid fields.")
+    
+    create_catalog_search()
+
+def create_catalog_search():
+    """Search the SQLite test case catalog built by `testgeneration.py --sqlite`"""
+    if not os.path.exists(DEFAULT_DB):
+        return
+    
+    st.markdown("### 🔎 Search Saved Catalog")
+    with CatalogStore(DEFAULT_DB) as store:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            api_filter = st.selectbox("API", ["(any)"] + sorted(store.summary()), key="catalog_api")
+        with col2:
+            field_filter = st.text_input("Field used", key="catalog_field")
+        with col3:
+            text_filter = st.text_input("PQL text", placeholder="e.g. HAVING", key="catalog_text")
+        
+        filters = {
+            "api": None if api_filter == "(any)" else api_filter,
+            "field": field_filter.strip() or None,
+            "match": text_filter.strip() or None
+        }
+        try:
+            total = store.count(**filters)
+            matches = store.select(limit=50, **filters)
+        except Exception as e:
+            st.error(f"Invalid search: {e}")
+            return
+    
+    st.metric("Matching Test Cases", total)
+    for i, test_case in enumerate(matches, 1):
+        with st.expander(f"{i}. [{test_case.api}] {test_case.description}", expanded=False):
+            st.code(format_json(test_case.request_body), language='json')
+            if st.button("Use This", key=f"use_catalog_{i}", use_container_width=True):
+                st.session_state.body_input = format_json(test_case.request_body)
+                st.success("✅ Test case loaded into Request Body!")
 
 def main():
-    tester = PostmanAPITester()
+    # Keep the tester (and its connection pool and cache) across Streamlit reruns
+    transport_name = st.session_state.get("transport_name", "http1")
+    use_cache = st.session_state.get("use_cache", False)
+    cache_ttl = st.session_state.get("cache_ttl", 3600)
+    replay_path = st.session_state.get("replay_path", "").strip()
+    realtime = st.session_state.get("replay_realtime", False)
+    tester = st.session_state.get("tester")
+    settings = (transport_name, use_cache, cache_ttl, replay_path, realtime)
+    if tester is None or st.session_state.get("tester_settings") != settings:
+        if tester is not None:
+            tester.transport.close()
+        cache = ResponseCache(DEFAULT_CACHE_DB, ttl=cache_ttl) if use_cache else None
+        cassette = None
+        if replay_path:
+            try:
+                cassette = Cassette(replay_path)
+            except (OSError, ValueError) as e:
+                st.sidebar.error(f"Cannot replay: {e}")
+        try:
+            tester = PostmanAPITester(transport_name, cache, cassette, realtime)
+        except ImportError as e:
+            st.sidebar.error(str(e))
+            tester = PostmanAPITester(cache=cache)
+        st.session_state.tester = tester
+        st.session_state.tester_settings = settings
     
     # Initialize session state
     if 'response_history' not in st.session_state:
@@ -226,6 +335,33 @@ def main():
             options=list(nav_options.keys()),
             key="navigation"
         )
+        
+        st.selectbox("Transport", list(TRANSPORTS), key="transport_name",
+                     help="http1: pooled keep-alive connections; http2: multiplexed (needs httpx[http2]); "
+                          "stub: in-process fake server, no network")
+        
+        st.checkbox("Cache responses", key="use_cache",
+                    help="Serve repeated (pql, limit, offset) requests from a local SQLite cache")
+        if st.session_state.get("use_cache"):
+            st.number_input("Cache TTL (seconds)", min_value=1, value=3600, step=60, key="cache_ttl")
+            if tester.cache is not None:
+                stats = tester.cache.stats()
+                cache_cols = st.columns(3)
+                cache_cols[0].metric("Hits", stats["hits"])
+                cache_cols[1].metric("Misses", stats["misses"])
+                cache_cols[2].metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+                st.caption(f"{stats['entries']} cached responses, {stats['bytes'] / 1024:.0f} KB")
+                if st.button("Clear Cache"):
+                    tester.cache.clear()
+                    st.rerun()
+        
+        st.text_input("Replay cassette", key="replay_path", placeholder="suite.cassette",
+                      help="Serve responses recorded with testgeneration.py --run --record instead of calling the API")
+        if st.session_state.get("replay_path", "").strip():
+            st.checkbox("Recorded latency", key="replay_realtime",
+                        help="Wait each response's recorded time instead of answering instantly")
+            if tester.transport_name == "replay":
+                st.caption(f"📼 {len(tester.transport.cassette)} recorded responses")
     
     # Main content based on navigation selection
     if selected_nav == "📤 Request & Response":
@@ -270,25 +406,39 @@ def main():
                 st.error("Invalid JSON in Body")
                 body = tester.default_body
             
+            # Catch malformed or schema-invalid PQL before spending a request on it
+            # Any JSON value parses; only an object can carry a pql field
+            pql = body.get("pql") if isinstance(body, dict) else None
+            pql_ok = show_pql_issues(pql) if isinstance(pql, str) else True
+            if not pql_ok:
+                # The local checker only knows a subset of PQL (no CASE WHEN, for one); let the API decide
+                pql_ok = st.checkbox("Send anyway", key="send_anyway",
+                                     help="Send the request even though the local PQL check reported errors")
+            
             # Execute button
             if st.button("🚀 SEND REQUEST", use_container_width=True, type="primary"):
-                with st.spinner("Sending request..."):
-                    result = tester.execute_request(headers, body)
-                    st.session_state.current_response = result
-                    
-                    # Add to history
-                    history_item = {
-                        "timestamp": datetime.now().strftime("%H:%M:%S"),
-                        "status": result["status_code"] if result["success"] else "Error",
-                        "method": "POST",
-                        "url": tester.base_url,
-                        "response_time": result.get("response_time", 0)
-                    }
-                    st.session_state.response_history.insert(0, history_item)
-                    
-                    # Keep only last 10 history items
-                    if len(st.session_state.response_history) > 10:
-                        st.session_state.response_history = st.session_state.response_history[:10]
+                if not pql_ok:
+                    st.error("Fix the PQL errors above, or tick 'Send anyway'")
+                else:
+                    with st.spinner("Sending request..."):
+                        result = tester.execute_request(headers, body)
+                        st.session_state.current_response = result
+                        st.session_state.current_request = (headers, body)
+                        st.session_state.pop("all_rows_csv", None)
+                        
+                        # Add to history
+                        history_item = {
+                            "timestamp": datetime.now().strftime("%H:%M:%S"),
+                            "status": result["status_code"] if result["success"] else "Error",
+                            "method": "POST",
+                            "url": tester.base_url,
+                            "response_time": result.get("response_time", 0)
+                        }
+                        st.session_state.response_history.insert(0, history_item)
+                        
+                        # Keep only last 10 history items
+                        if len(st.session_state.response_history) > 10:
+                            st.session_state.response_history = st.session_state.response_history[:10]
             
             st.markdown('</div>', unsafe_allow_html=True)
         
@@ -309,7 +459,8 @@ def main():
                         st.markdown(f'<div class="error-badge">ERROR</div>', unsafe_allow_html=True)
                 
                 with col2:
-                    st.metric("Time", f"{result.get('response_time', 0):.0f} ms")
+                    st.metric("Time", f"{result.get('response_time', 0):.0f} ms",
+                              delta="cached" if result.get("cached") else None, delta_color="off")
                 
                 with col3:
                     if result["success"] and "data" in result:
@@ -357,6 +508,36 @@ def main():
                                 file_name="api_response.csv",
                                 mime="text/csv"
                             )
+                            
+                            # The table holds one page; pull the rest of the result on request
+                            try:
+                                total_count = int(response_data.get("total_count", 0))
+                            except (TypeError, ValueError):
+                                total_count = 0
+                            # Paging rewrites the body's offset, so it needs an object body
+                            if (total_count > len(response_data["items"]) and "current_request" in st.session_state
+                                    and isinstance(st.session_state.current_request[1], dict)):
+                                if st.button(f"⏬ Fetch all {total_count} rows"):
+                                    bar = st.progress(0.0, text="Fetching pages...")
+                                    
+                                    def show_progress(rows, total):
+                                        bar.progress(min(1.0, rows / max(1, total_count)), text=f"{rows} / {total} rows")
+                                    
+                                    req_headers, req_body = st.session_state.current_request
+                                    try:
+                                        all_csv, rows = tester.fetch_all_csv(
+                                            req_headers, dict(req_body, offset="0"), show_progress)
+                                        st.session_state.all_rows_csv = (all_csv, rows)
+                                    except (PageError, TransportError) as e:
+                                        st.error(f"Fetching all pages failed: {e}")
+                                if "all_rows_csv" in st.session_state:
+                                    all_csv, rows = st.session_state.all_rows_csv
+                                    st.download_button(
+                                        label=f"📥 Download all {rows} rows (CSV)",
+                                        data=all_csv,
+                                        file_name="api_response_all.csv",
+                                        mime="text/csv"
+                                    )
                         else:
                             st.json(response_data)
                     else:
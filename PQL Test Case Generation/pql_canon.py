@@ -0,0 +1,183 @@
+import hashlib
+import math
+import re
+from typing import Dict, Iterable, Iterator, List
+
+# String literals, bracketed identifiers, numbers, words, two-char operators, any other symbol
+_TOKEN_RE = re.compile(r"'(?:[^']|'')*'|\[[^\]]*\]|\d+(?:\.\d+)?|\w+|<>|!=|<=|>=|\S")
+
+
+def tokenize(pql: str) -> List[str]:
+    """Split PQL into tokens, uppercasing bare words (keywords and functions)"""
+    tokens = []
+    for token in _TOKEN_RE.findall(pql):
+        if token[0].isalpha() or token[0] == "_":
+            token = token.upper()
+        tokens.append(token)
+    return tokens
+
+
+def _split_top_level(tokens: List[str], separators: set) -> tuple:
+    """Split tokens at separators outside parentheses; returns (parts, separators found)"""
+    parts, found, current, depth = [], [], [], 0
+    for token in tokens:
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        if depth == 0 and token in separators:
+            parts.append(current)
+            found.append(token)
+            current = []
+        else:
+            current.append(token)
+    parts.append(current)
+    return parts, found
+
+
+def _dedupe_projections(tokens: List[str]) -> List[str]:
+    """Drop repeated items from every SELECT list, keeping first occurrences"""
+    out, i = [], 0
+    while i < len(tokens):
+        out.append(tokens[i])
+        if tokens[i] != "SELECT":
+            i += 1
+            continue
+        i += 1
+        if i < len(tokens) and tokens[i] == "DISTINCT":
+            out.append(tokens[i])
+            i += 1
+        # Projection runs to the FROM at the same parenthesis depth
+        start, depth = i, 0
+        while i < len(tokens) and not (depth == 0 and tokens[i] == "FROM"):
+            depth += tokens[i] == "("
+            depth -= tokens[i] == ")"
+            if depth < 0:
+                break
+            i += 1
+        items, _ = _split_top_level(tokens[start:i], {","})
+        seen = []
+        for item in items:
+            if item not in seen:
+                seen.append(item)
+        for n, item in enumerate(seen):
+            if n:
+                out.append(",")
+            out.extend(_dedupe_projections(item))
+    return out
+
+
+# Tokens that end a whole comparison: anything else next to an operand (+, -, *, ...) binds tighter than =
+_COMPARISON_BOUNDARIES = {"ON", "WHERE", "HAVING", "AND", "OR", "NOT", "(", ")", "JOIN", "INNER", "LEFT", "RIGHT",
+                          "FULL", "CROSS", "GROUP", "ORDER", "LIMIT", "UNION", None}
+
+
+def _order_equalities(tokens: List[str]) -> List[str]:
+    """Order the operands of identifier = identifier comparisons
+
+    Only whole comparisons are reordered: ``[a.y] - [a.z] = [a.w]`` compares
+    an expression, and swapping ``[a.z]`` and ``[a.w]`` would change it.
+    """
+    tokens = list(tokens)
+    for i in range(len(tokens) - 2):
+        left, op, right = tokens[i:i + 3]
+        if op != "=" or left[0] != "[" or right[0] != "[" or not right < left:
+            continue
+        before = tokens[i - 1] if i else None
+        after = tokens[i + 3] if i + 3 < len(tokens) else None
+        if before in _COMPARISON_BOUNDARIES and after in _COMPARISON_BOUNDARIES:
+            tokens[i], tokens[i + 2] = right, left
+    return tokens
+
+
+def _order_union_branches(tokens: List[str]) -> List[str]:
+    """Sort the branches of a top-level UNION chain (set union is commutative)"""
+    branches, separators = _split_top_level(tokens, {"UNION"})
+    if not separators or any(branch and branch[0] == "ALL" for branch in branches[1:]):
+        return tokens
+    if any("ORDER" in branch or "LIMIT" in branch for branch in branches):
+        return tokens
+    branches = sorted(branches, key=" ".join)
+    out = list(branches[0])
+    for branch in branches[1:]:
+        out.append("UNION")
+        out.extend(branch)
+    return out
+
+
+def canonicalize_pql(pql: str) -> str:
+    """Canonical form of a query for equality checks and hashing
+
+    Normalizes whitespace and keyword case, drops duplicate projections
+    (outside UNION queries), orders operands of whole ``[a.x] = [b.x]``
+    comparisons and sorts UNION branches.
+    """
+    tokens = tokenize(pql)
+    # UNION branches must keep matching column counts, so their projections stay as written
+    if "UNION" not in tokens:
+        tokens = _dedupe_projections(tokens)
+    tokens = _order_equalities(tokens)
+    tokens = _order_union_branches(tokens)
+    return " ".join(tokens)
+
+
+def request_hash(pql: str, limit: str = "", offset: str = "", *extra: str) -> str:
+    """Stable hash of a canonicalized request"""
+    key = "\x1f".join([canonicalize_pql(pql), str(limit), str(offset), *map(str, extra)])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def case_hash(test_case: Dict) -> str:
+    """Stable hash of a test case's request body"""
+    body = test_case["request_body"]
+    return request_hash(body["pql"], body.get("limit", ""), body.get("offset", ""))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex digests, for deduplicating very large catalogs"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: str) -> Iterator[int]:
+        # Double hashing from two halves of the digest
+        h1, h2 = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, digest: str) -> bool:
+        """Add a digest; returns True if it was (probably) not present before"""
+        new = False
+        for pos in self._positions(digest):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        return new
+
+
+class Deduplicator:
+    """Tracks seen case hashes with an exact set or, at catalog scale, a Bloom filter"""
+
+    def __init__(self, bloom: bool = False, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self._bloom = BloomFilter(capacity, error_rate) if bloom else None
+        self._seen = set()
+        self.duplicates = 0
+
+    def add(self, digest: str) -> bool:
+        """Record a digest; returns False if it is a duplicate"""
+        if self._bloom is not None:
+            new = self._bloom.add(digest)
+        else:
+            new = digest not in self._seen
+            self._seen.add(digest)
+        if not new:
+            self.duplicates += 1
+        return new
+
+    def filter(self, test_cases: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield only test cases whose canonical request has not been seen"""
+        for test_case in test_cases:
+            if self.add(case_hash(test_case)):
+                yield test_case
@@ -0,0 +1,199 @@
+import json
+import statistics
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from catalog_io import read_jsonl
+from pql_parser import AGGREGATES, PQLError, parse_pql
+from schema_registry import SchemaRegistry
+
+# Feature -> default weight in milliseconds per unit, used until calibrated
+DEFAULT_WEIGHTS = {
+    "columns": 2.0,         # projected columns (SELECT * counts every schema field)
+    "cells": 0.05,          # page rows x projected columns: response payload size
+    "joins": 40.0,
+    "unfiltered_joins": 80.0,  # joins in a SELECT without WHERE: nothing limits the join
+    "subqueries": 60.0,
+    "unions": 30.0,
+    "predicates": 5.0,
+    "aggregates": 10.0,
+    "grouping": 20.0,       # GROUP BY expressions plus HAVING
+    "distinct": 15.0,
+    "order_by": 15.0,
+}
+DEFAULT_INTERCEPT = 50.0
+FEATURES = tuple(DEFAULT_WEIGHTS)
+
+
+def query_features(pql: str, limit: Any, registry: SchemaRegistry) -> Dict[str, float]:
+    """Static cost features of a query; raises PQLError if it does not parse"""
+    query = parse_pql(pql)
+    try:
+        rows = int(limit)
+    except (TypeError, ValueError):
+        rows = 50
+    features = dict.fromkeys(FEATURES, 0.0)
+    features["unions"] = float(len(query.selects) - 1)
+    top_level = {id(select) for select in query.selects}
+    for select in query.iter_selects():
+        if select.star:
+            width = sum(len(registry.fields(table.api)) for table in select.tables)
+        else:
+            width = len(select.columns)
+        joins = len(select.tables) - 1
+        features["columns"] += width
+        features["joins"] += joins
+        if select.where is None:
+            features["unfiltered_joins"] += joins
+        features["predicates"] += len(select.predicates)
+        features["aggregates"] += sum(1 for name, _ in select.functions if name in AGGREGATES)
+        features["grouping"] += len(select.group_by) + (select.having is not None)
+        features["distinct"] += select.distinct
+        features["order_by"] += len(select.order_by)
+        # Only the outer SELECTs return rows to the client
+        if id(select) in top_level:
+            page = min(rows, select.limit) if select.limit is not None else rows
+            features["cells"] += page * width
+    features["subqueries"] = float(sum(1 for _ in query.iter_selects()) - len(query.selects))
+    return features
+
+
+class CostModel:
+    """Linear latency model over static query features, calibratable from observed latencies"""
+
+    def __init__(self, registry: SchemaRegistry, weights: Dict[str, float] = None,
+                 intercept: float = DEFAULT_INTERCEPT):
+        self.registry = registry
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.intercept = intercept
+        self.observations = 0
+
+    def features(self, test_case: Any) -> Dict[str, float]:
+        body = test_case["request_body"]
+        return query_features(body["pql"], body.get("limit"), self.registry)
+
+    def estimate(self, test_case: Any) -> float:
+        """Estimated latency in ms; None for a query that does not parse"""
+        try:
+            features = self.features(test_case)
+        except PQLError:
+            return None
+        return round(self.intercept + sum(self.weights[name] * value for name, value in features.items()), 1)
+
+    def annotate(self, test_cases: Iterable[Any]) -> Iterator[Tuple[Any, float]]:
+        """Lazily pair each case with its estimated cost"""
+        for test_case in test_cases:
+            yield test_case, self.estimate(test_case)
+
+    def calibrate(self, observations: Iterable[Tuple[Any, float]], strength: float = 1.0) -> int:
+        """Fit weights to (case, observed latency ms) pairs; returns the number of observations used
+
+        Ridge regression shrunk toward the current weights, so a handful of
+        observations nudges the model instead of overfitting it; ``strength``
+        scales the shrinkage. Weights are clamped at zero so no feature can
+        make a query cheaper.
+        """
+        names = ("intercept",) + FEATURES
+        size = len(names)
+        xtx = [[0.0] * size for _ in range(size)]
+        xty = [0.0] * size
+        n = 0
+        for test_case, latency in observations:
+            try:
+                features = self.features(test_case)
+            except PQLError:
+                continue
+            row = [1.0] + [features[name] for name in FEATURES]
+            for i in range(size):
+                xty[i] += row[i] * latency
+                for j in range(size):
+                    xtx[i][j] += row[i] * row[j]
+            n += 1
+        if not n:
+            return 0
+
+        prior = [self.intercept] + [self.weights[name] for name in FEATURES]
+        for i in range(size):
+            # Scale the penalty to each feature's spread so rare and frequent features shrink alike
+            penalty = strength * max(xtx[i][i] / n, 1e-6)
+            xtx[i][i] += penalty
+            xty[i] += penalty * prior[i]
+        solution = _solve(xtx, xty)
+        self.intercept = max(solution[0], 0.0)
+        self.weights = {name: max(value, 0.0) for name, value in zip(FEATURES, solution[1:])}
+        self.observations += n
+        return n
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"intercept": self.intercept, "weights": self.weights, "observations": self.observations}
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str, registry: SchemaRegistry) -> "CostModel":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        model = cls(registry, data.get("weights"), data.get("intercept", DEFAULT_INTERCEPT))
+        model.observations = data.get("observations", 0)
+        return model
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Solve a small dense linear system by Gaussian elimination with partial pivoting"""
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            continue
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            if factor:
+                for c in range(col, size + 1):
+                    rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        if abs(rows[r][r]) < 1e-12:
+            continue
+        solution[r] = (rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))) / rows[r][r]
+    return solution
+
+
+def split_tiers(scored: Iterable[Tuple[Any, float]], threshold: float = None) -> Dict[str, List[Tuple[Any, float]]]:
+    """Split (case, cost) pairs into fast/slow tiers at ``threshold`` (default: the median cost)
+
+    Unparseable cases (cost None) go to their own ``invalid`` tier.
+    """
+    scored = list(scored)
+    costs = [cost for _, cost in scored if cost is not None]
+    if threshold is None:
+        threshold = statistics.median(costs) if costs else 0.0
+    tiers = {"fast": [], "slow": [], "invalid": []}
+    for test_case, cost in scored:
+        tier = "invalid" if cost is None else ("fast" if cost <= threshold else "slow")
+        tiers[tier].append((test_case, cost))
+    return tiers
+
+
+def within_budget(scored: Iterable[Tuple[Any, float]], budget: float) -> List[Tuple[Any, float]]:
+    """Cheapest cases first until their summed cost would exceed ``budget``"""
+    chosen, spent = [], 0.0
+    for test_case, cost in sorted((item for item in scored if item[1] is not None), key=lambda item: item[1]):
+        if spent + cost > budget:
+            break
+        chosen.append((test_case, cost))
+        spent += cost
+    return chosen
+
+
+def read_observations(filename: str) -> Iterator[Tuple[Dict[str, Any], float]]:
+    """(case, latency ms) pairs from a JSONL results file with request_body and response_time
+
+    Failed requests (``"success": false``) are skipped: their latency says
+    nothing about query cost.
+    """
+    for record in read_jsonl(filename):
+        if record.get("success", True) and record.get("response_time") is not None and "request_body" in record:
+            yield record, float(record["response_time"])
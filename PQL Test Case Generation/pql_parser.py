@@ -0,0 +1,551 @@
+import difflib
+import re
+from typing import Any, Dict, List, Tuple
+
+from schema_registry import SchemaRegistry
+
+# One alternative per token kind; anything else is a lexical error
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<ident>\[[^\[\]]*\])
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<word>[A-Za-z_]\w*)
+  | (?P<op><>|!=|<=|>=|[=<>+\-*/%])
+  | (?P<punct>[(),;])
+  | (?P<error>.)
+""", re.VERBOSE | re.DOTALL)
+
+KEYWORDS = frozenset("""
+    SELECT DISTINCT ALL FROM WHERE GROUP BY HAVING ORDER ASC DESC LIMIT OFFSET UNION AS ON
+    JOIN INNER LEFT RIGHT FULL OUTER CROSS AND OR NOT IN LIKE BETWEEN IS NULL EXISTS TRUE FALSE
+""".split())
+JOIN_TYPES = ("INNER", "LEFT", "RIGHT", "FULL", "CROSS")
+COMPARISONS = frozenset(("=", "<>", "!=", "<", ">", "<=", ">="))
+AGGREGATES = frozenset(("COUNT", "SUM", "AVG", "MIN", "MAX"))
+# Name fragments of fields that hold text: numeric predicates or SUM/AVG on them are suspicious
+TEXT_FIELD_HINTS = ("name", "description", "type", "status", "code", "message", "email", "address")
+NUMERIC_FIELD_HINTS = ("_id", "amount", "balance", "total", "number", "count", "quantity")
+
+
+class PQLError(ValueError):
+    """A problem found in a PQL query, anchored at a character offset"""
+
+    def __init__(self, message: str, pos: int, severity: str = "error"):
+        super().__init__(message)
+        self.message = message
+        self.pos = pos
+        self.severity = severity
+
+    def __str__(self) -> str:
+        return f"{self.message} (at position {self.pos})"
+
+
+def lex(pql: str) -> List[Tuple[str, str, int]]:
+    """Tokenize PQL into (kind, value, position) tuples; bare words are uppercased"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(pql):
+        kind = match.lastgroup
+        if kind == "ws":
+            continue
+        value = match.group()
+        if kind == "error":
+            if value == "'":
+                raise PQLError("Unterminated string literal", match.start())
+            if value in "[]":
+                raise PQLError("Unbalanced '[' ']' in identifier", match.start())
+            raise PQLError(f"Unexpected character {value!r}", match.start())
+        if kind == "word":
+            value = value.upper()
+        tokens.append((kind, value, match.start()))
+    tokens.append(("eof", "", len(pql)))
+    return tokens
+
+
+class ColumnRef:
+    """``[qualifier.field]`` reference; ``pos`` is the offset of the opening bracket"""
+    __slots__ = ("qualifier", "field", "pos")
+
+    def __init__(self, qualifier: str, field: str, pos: int):
+        self.qualifier = qualifier
+        self.field = field
+        self.pos = pos
+
+    def __repr__(self) -> str:
+        return f"[{self.qualifier}.{self.field}]"
+
+
+class TableRef:
+    """A FROM or JOIN source; ``join`` is None for the first FROM table"""
+    __slots__ = ("api", "alias", "join", "has_condition", "pos")
+
+    def __init__(self, api: str, alias: str, join: str, pos: int):
+        self.api = api
+        self.alias = alias
+        self.join = join
+        self.has_condition = False
+        self.pos = pos
+
+
+class Select:
+    """One SELECT block, with the facts validation and cost estimation need
+
+    Expressions are nested tuples: ``("col", ColumnRef)``, ``("lit", kind, value)``,
+    ``("name", word)``, ``("func", name, args)``, ``("op", op, *operands)``,
+    ``("exists", Query)`` and ``("subquery", Query)``.
+    """
+    __slots__ = ("distinct", "star", "columns", "tables", "where", "group_by", "having", "order_by",
+                 "limit", "column_refs", "predicates", "functions", "subqueries")
+
+    def __init__(self):
+        self.distinct = False
+        self.star = False
+        self.columns = []
+        self.tables = []
+        self.where = None
+        self.group_by = []
+        self.having = None
+        self.order_by = []
+        self.limit = None
+        self.column_refs = []
+        # (operator, left operand, right operands) for every comparison-like predicate
+        self.predicates = []
+        # (name, args) for every function call
+        self.functions = []
+        self.subqueries = []
+
+    def iter_selects(self):
+        """This block and every block nested in it"""
+        yield self
+        for query in self.subqueries:
+            for select in query.selects:
+                yield from select.iter_selects()
+
+
+class Query:
+    """A SELECT, or several joined by UNION [ALL]"""
+    __slots__ = ("selects", "union_all")
+
+    def __init__(self, selects: List[Select], union_all: List[bool]):
+        self.selects = selects
+        self.union_all = union_all
+
+    def iter_selects(self):
+        for select in self.selects:
+            yield from select.iter_selects()
+
+
+class _Parser:
+    """Recursive-descent parser over lex() tokens"""
+
+    def __init__(self, pql: str):
+        self.pql = pql
+        self.tokens = lex(pql)
+        self.i = 0
+        self.scope = []
+
+    # -- token helpers --
+    def peek(self, offset: int = 0) -> Tuple[str, str, int]:
+        return self.tokens[min(self.i + offset, len(self.tokens) - 1)]
+
+    def is_word(self, *words: str) -> bool:
+        kind, value, _ = self.tokens[self.i]
+        return kind == "word" and value in words
+
+    def is_symbol(self, *symbols: str) -> bool:
+        kind, value, _ = self.tokens[self.i]
+        return kind in ("op", "punct") and value in symbols
+
+    def advance(self) -> Tuple[str, str, int]:
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def error(self, expected: str) -> PQLError:
+        kind, value, pos = self.tokens[self.i]
+        found = "end of query" if kind == "eof" else repr(value)
+        return PQLError(f"Expected {expected}, found {found}", pos)
+
+    def expect_word(self, word: str):
+        if not self.is_word(word):
+            raise self.error(word)
+        self.i += 1
+
+    def expect_symbol(self, symbol: str):
+        if not self.is_symbol(symbol):
+            raise self.error(f"'{symbol}'")
+        self.i += 1
+
+    # -- statements --
+    def parse(self) -> Query:
+        query = self.query()
+        if self.is_symbol(";"):
+            self.i += 1
+        if self.peek()[0] != "eof":
+            raise self.error("end of query")
+        return query
+
+    def query(self) -> Query:
+        selects, union_all = [self.select()], []
+        while self.is_word("UNION"):
+            self.i += 1
+            union_all.append(self.is_word("ALL"))
+            if union_all[-1]:
+                self.i += 1
+            selects.append(self.select())
+        return Query(selects, union_all)
+
+    def select(self) -> Select:
+        select = Select()
+        self.scope.append(select)
+        try:
+            self.expect_word("SELECT")
+            if self.is_word("DISTINCT", "ALL"):
+                select.distinct = self.advance()[1] == "DISTINCT"
+            if self.is_symbol("*"):
+                self.i += 1
+                select.star = True
+            else:
+                select.columns.append(self.select_item())
+                while self.is_symbol(","):
+                    self.i += 1
+                    select.columns.append(self.select_item())
+            self.expect_word("FROM")
+            select.tables.append(self.table_ref(None))
+            self.joins(select)
+            if self.is_word("WHERE"):
+                self.i += 1
+                select.where = self.expr()
+            if self.is_word("GROUP"):
+                self.i += 1
+                self.expect_word("BY")
+                select.group_by = self.expr_list()
+            if self.is_word("HAVING"):
+                self.i += 1
+                select.having = self.expr()
+            if self.is_word("ORDER"):
+                self.i += 1
+                self.expect_word("BY")
+                select.order_by = self.expr_list(directions=True)
+            if self.is_word("LIMIT"):
+                self.i += 1
+                select.limit = self.integer()
+                if self.is_word("OFFSET"):
+                    self.i += 1
+                    self.integer()
+        finally:
+            self.scope.pop()
+        return select
+
+    def select_item(self):
+        expr = self.expr()
+        if self.is_word("AS"):
+            self.i += 1
+            self.alias(required=True)
+        elif self.peek()[0] == "word" and self.peek()[1] not in KEYWORDS:
+            self.i += 1
+        return expr
+
+    def alias(self, required: bool = False) -> str:
+        kind, value, pos = self.peek()
+        if kind == "word" and value not in KEYWORDS:
+            self.i += 1
+            # lex() uppercases words; an alias keeps its spelling so [a.field] can refer to it
+            return self.pql[pos:pos + len(value)]
+        if kind == "ident" and "." not in value:
+            self.i += 1
+            return value[1:-1]
+        if required:
+            raise self.error("alias")
+        return None
+
+    def table_ref(self, join: str) -> TableRef:
+        kind, value, pos = self.peek()
+        if kind != "ident":
+            raise self.error("table reference like [api_name]")
+        if "." in value:
+            raise PQLError(f"Expected table reference, found column reference {value}", pos)
+        self.i += 1
+        if self.is_word("AS"):
+            self.i += 1
+            alias = self.alias(required=True)
+        else:
+            alias = self.alias()
+        return TableRef(value[1:-1], alias, join, pos)
+
+    def joins(self, select: Select):
+        while True:
+            if self.is_symbol(","):
+                self.i += 1
+                select.tables.append(self.table_ref("CROSS"))
+                continue
+            if self.is_word(*JOIN_TYPES):
+                join = self.advance()[1]
+                if join != "CROSS" and join != "INNER" and self.is_word("OUTER"):
+                    self.i += 1
+            elif self.is_word("JOIN"):
+                join = "INNER"
+            else:
+                return
+            self.expect_word("JOIN")
+            table = self.table_ref(join)
+            select.tables.append(table)
+            if join != "CROSS":
+                self.expect_word("ON")
+                self.expr()
+                table.has_condition = True
+
+    def expr_list(self, directions: bool = False) -> list:
+        items = []
+        while True:
+            items.append(self.expr())
+            if directions and self.is_word("ASC", "DESC"):
+                self.i += 1
+            if not self.is_symbol(","):
+                return items
+            self.i += 1
+
+    def integer(self) -> int:
+        kind, value, _ = self.peek()
+        if kind != "number" or "." in value:
+            raise self.error("integer")
+        self.i += 1
+        return int(value)
+
+    # -- expressions, lowest precedence first --
+    def expr(self):
+        left = self.and_expr()
+        while self.is_word("OR"):
+            self.i += 1
+            left = ("op", "OR", left, self.and_expr())
+        return left
+
+    def and_expr(self):
+        left = self.not_expr()
+        while self.is_word("AND"):
+            self.i += 1
+            left = ("op", "AND", left, self.not_expr())
+        return left
+
+    def not_expr(self):
+        if self.is_word("NOT") and not (self.peek(1)[0] == "word" and self.peek(1)[1] == "EXISTS"):
+            self.i += 1
+            return ("op", "NOT", self.not_expr())
+        return self.predicate()
+
+    def predicate(self):
+        if self.is_word("NOT", "EXISTS"):
+            negated = self.advance()[1] == "NOT"
+            if negated:
+                self.expect_word("EXISTS")
+            node = ("exists", self.parenthesized_query())
+            self.scope[-1].predicates.append(("NOT EXISTS" if negated else "EXISTS", None, ()))
+            return node
+
+        left = self.additive()
+        negated = False
+        if self.is_word("NOT") and self.peek(1)[0] == "word" and self.peek(1)[1] in ("IN", "LIKE", "BETWEEN"):
+            self.i += 1
+            negated = True
+        prefix = "NOT " if negated else ""
+
+        if self.is_symbol(*COMPARISONS):
+            op = self.advance()[1]
+            right = (self.additive(),)
+        elif self.is_word("IN"):
+            self.i += 1
+            op = prefix + "IN"
+            if self.peek(1)[0] == "word" and self.peek(1)[1] == "SELECT":
+                right = (("subquery", self.parenthesized_query()),)
+            else:
+                self.expect_symbol("(")
+                right = tuple(self.expr_list())
+                self.expect_symbol(")")
+        elif self.is_word("LIKE"):
+            self.i += 1
+            op = prefix + "LIKE"
+            right = (self.additive(),)
+        elif self.is_word("BETWEEN"):
+            self.i += 1
+            op = prefix + "BETWEEN"
+            low = self.additive()
+            self.expect_word("AND")
+            right = (low, self.additive())
+        elif self.is_word("IS"):
+            self.i += 1
+            op = "IS NULL"
+            if self.is_word("NOT"):
+                self.i += 1
+                op = "IS NOT NULL"
+            self.expect_word("NULL")
+            right = ()
+        else:
+            return left
+        self.scope[-1].predicates.append((op, left, right))
+        return ("op", op, left, *right)
+
+    def additive(self):
+        left = self.multiplicative()
+        while self.is_symbol("+", "-"):
+            left = ("op", self.advance()[1], left, self.multiplicative())
+        return left
+
+    def multiplicative(self):
+        left = self.unary()
+        while self.is_symbol("*", "/", "%"):
+            left = ("op", self.advance()[1], left, self.unary())
+        return left
+
+    def unary(self):
+        if self.is_symbol("-", "+"):
+            return ("op", "NEG" if self.advance()[1] == "-" else "POS", self.unary())
+        return self.primary()
+
+    def primary(self):
+        kind, value, pos = self.peek()
+        if kind == "number":
+            self.i += 1
+            return ("lit", "number", value)
+        if kind == "string":
+            self.i += 1
+            return ("lit", "string", value[1:-1].replace("''", "'"))
+        if kind == "ident":
+            self.i += 1
+            qualifier, dot, field = value[1:-1].partition(".")
+            if not dot or not qualifier or not field:
+                raise PQLError(f"Expected column reference like [api.field], found {value}", pos)
+            ref = ColumnRef(qualifier, field, pos)
+            self.scope[-1].column_refs.append(ref)
+            return ("col", ref)
+        if kind == "word":
+            if value in ("NULL", "TRUE", "FALSE"):
+                self.i += 1
+                return ("lit", value.lower(), value)
+            if self.peek(1)[1] == "(" and self.peek(1)[0] == "punct":
+                return self.function()
+            if value not in KEYWORDS:
+                self.i += 1
+                return ("name", value)
+        if self.is_symbol("("):
+            if self.peek(1)[0] == "word" and self.peek(1)[1] == "SELECT":
+                return ("subquery", self.parenthesized_query())
+            self.i += 1
+            inner = self.expr()
+            self.expect_symbol(")")
+            return inner
+        raise self.error("expression")
+
+    def function(self):
+        name = self.advance()[1]
+        self.expect_symbol("(")
+        if self.is_symbol("*"):
+            self.i += 1
+            args = (("lit", "star", "*"),)
+        elif self.is_symbol(")"):
+            args = ()
+        else:
+            if self.is_word("DISTINCT"):
+                self.i += 1
+            args = tuple(self.expr_list())
+        self.expect_symbol(")")
+        self.scope[-1].functions.append((name, args))
+        return ("func", name, args)
+
+    def parenthesized_query(self) -> Query:
+        self.expect_symbol("(")
+        query = self.query()
+        self.expect_symbol(")")
+        self.scope[-1].subqueries.append(query)
+        return query
+
+
+def parse_pql(pql: str) -> Query:
+    """Parse a PQL query, raising PQLError with the offset of the first syntax error"""
+    return _Parser(pql).parse()
+
+
+def _looks_textual(field: str) -> bool:
+    lowered = field.lower()
+    return (any(hint in lowered for hint in TEXT_FIELD_HINTS)
+            and not any(hint in lowered for hint in NUMERIC_FIELD_HINTS))
+
+
+class PQLValidator:
+    """Checks parsed PQL against the schema: APIs, fields and which APIs are in scope"""
+
+    def __init__(self, registry: SchemaRegistry):
+        self.registry = registry
+
+    def validate(self, pql: str) -> List[PQLError]:
+        """Every problem found, errors and warnings, ordered by position; empty if the query is clean"""
+        try:
+            query = parse_pql(pql)
+        except PQLError as e:
+            return [e]
+        issues = []
+        self._check_query(query, [], issues)
+        issues.sort(key=lambda issue: issue.pos)
+        return issues
+
+    def is_valid(self, pql: str) -> bool:
+        return not any(issue.severity == "error" for issue in self.validate(pql))
+
+    def _check_query(self, query: Query, outer: List[Dict[str, str]], issues: List[PQLError]):
+        for select in query.selects:
+            self._check_select(select, outer, issues)
+
+    def _check_select(self, select: Select, outer: List[Dict[str, str]], issues: List[PQLError]):
+        scope = {}
+        for table in select.tables:
+            if table.api not in self.registry:
+                issues.append(PQLError(f"Unknown API [{table.api}]{self._suggest(table.api, self.registry.api_names())}",
+                                       table.pos))
+            scope[table.api] = table.api
+            if table.alias:
+                # Bare-word aliases are case-insensitive: AS a and AS A both qualify [a.field]
+                scope[table.alias] = table.api
+                scope.setdefault(table.alias.lower(), table.api)
+            if table.join in ("LEFT", "RIGHT", "FULL", "INNER") and not table.has_condition:
+                issues.append(PQLError(f"JOIN [{table.api}] has no ON condition", table.pos))
+        scopes = [scope] + outer
+
+        for ref in select.column_refs:
+            api = next((s.get(ref.qualifier) or s.get(ref.qualifier.lower())
+                        for s in scopes if ref.qualifier in s or ref.qualifier.lower() in s), None)
+            if api is None:
+                if ref.qualifier in self.registry:
+                    issues.append(PQLError(f"[{ref.qualifier}] is referenced but not in the FROM clause", ref.pos))
+                else:
+                    issues.append(PQLError(f"Unknown API [{ref.qualifier}]"
+                                           f"{self._suggest(ref.qualifier, self.registry.api_names())}", ref.pos))
+                continue
+            if ref.field == "*" or api not in self.registry:
+                continue
+            if not self.registry.has_field(api, ref.field):
+                field_pos = ref.pos + len(ref.qualifier) + 2
+                issues.append(PQLError(f"Unknown field '{ref.field}' for API [{api}]"
+                                       f"{self._suggest(ref.field, self.registry.fields(api))}", field_pos))
+
+        for op, left, right in select.predicates:
+            if left is None or left[0] != "col" or not _looks_textual(left[1].field):
+                continue
+            if op in COMPARISONS or op.endswith(("IN", "BETWEEN")):
+                if right and all(node[0] == "lit" and node[1] == "number" for node in right):
+                    issues.append(PQLError(f"Numeric {op} on text-like field '{left[1].field}'",
+                                           left[1].pos, "warning"))
+        for name, args in select.functions:
+            if name in ("SUM", "AVG") and args and args[0][0] == "col" and _looks_textual(args[0][1].field):
+                issues.append(PQLError(f"{name} over text-like field '{args[0][1].field}'", args[0][1].pos, "warning"))
+
+        for subquery in select.subqueries:
+            self._check_query(subquery, scopes, issues)
+
+    @staticmethod
+    def _suggest(name: str, candidates) -> str:
+        matches = difflib.get_close_matches(name, list(candidates), n=1)
+        return f"; did you mean '{matches[0]}'?" if matches else ""
+
+
+def validate_case(test_case: Any, validator: PQLValidator) -> List[PQLError]:
+    """Validate the PQL of a TestCase record or case dict"""
+    return validator.validate(test_case["request_body"]["pql"])
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Tuple
+
+from pql_parser import PQLError, parse_pql
+
+# handler(request body) -> (HTTP status, JSON payload)
+Handler = Callable[[Dict[str, Any]], Tuple[int, Dict[str, Any]]]
+
+
+def stub_handler(body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """Deterministic stand-in for the practice_query endpoint
+
+    Returns 400 for PQL that does not parse, otherwise a response in the
+    practice_query shape whose total_count is derived from a hash of the
+    query and whose items carry the projected field names.
+    """
+    pql = body.get("pql", "")
+    try:
+        query = parse_pql(pql)
+        limit, offset = int(body.get("limit", 50)), int(body.get("offset", 0))
+    except (PQLError, TypeError, ValueError) as e:
+        return 400, {"error_code": "400", "short_message": "Bad Request", "long_message": str(e)}
+
+    digest = hashlib.blake2b(pql.encode("utf-8"), digest_size=4).digest()
+    total_count = int.from_bytes(digest, "big") % 1000
+    columns = [node[1].field if node[0] == "col" else f"column{i + 1}"
+               for i, node in enumerate(query.selects[0].columns)] or ["value"]
+    rows = max(0, min(limit, total_count - offset))
+    items = [{column: f"{column}_{offset + row}" for column in columns} for row in range(rows)]
+    return 200, {
+        "offset": str(offset),
+        "limit": str(limit),
+        "total_count": str(total_count),
+        "execution_time": "0",
+        "pagination": {},
+        "items": items,
+    }
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Concurrent runners open many connections at once; the default backlog of 5 resets them
+    request_queue_size = 256
+
+
+class StubServer:
+    """Local HTTP server answering POSTs with a handler, for running suites offline
+
+    Binds to 127.0.0.1 on a free port (``url`` has the address) and serves
+    from a background thread; ``delay`` adds a fixed per-request latency in
+    seconds. Use as a context manager.
+    """
+
+    def __init__(self, handler: Handler = stub_handler, delay: float = 0.0, port: int = 0):
+        self.handler = handler
+        self.delay = delay
+        self.requests = 0
+        stub = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, delayed ACKs add ~40 ms per request
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    status, payload = stub.handler(body)
+                except ValueError as e:
+                    status, payload = 400, {"error_code": "400", "long_message": str(e)}
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = _ThreadingServer(("127.0.0.1", port), _RequestHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v4/practice_query"
+        self._thread = None
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
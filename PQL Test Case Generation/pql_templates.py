@@ -0,0 +1,172 @@
+import json
+import os
+import re
+from string import Formatter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from test_case import DEFAULT_PAGE, TestCase
+
+try:
+    import yaml
+except ImportError:  # YAML template files are optional; JSON always works
+    yaml = None
+
+DEFAULT_TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pql_templates.json")
+
+# Names every template may use without declaring them
+BUILTIN_NAMES = ("api", "limit", "offset")
+
+
+class TemplateError(ValueError):
+    """A template file that cannot be compiled"""
+
+
+class Placeholder:
+    """One compiled placeholder: how to list its candidate values for an API
+
+    Field placeholders pick fields of the API being expanded, filtered by a
+    field class (``numeric``, ``text``, ``join_key``, ... or ``any``), a name
+    regex, ``exclude`` and ``shared`` (only fields other APIs carry too).
+    ``count`` turns a field placeholder into a projection of the first N
+    matching fields. API placeholders (``api_with``) list the other APIs that
+    carry the field bound to an earlier placeholder.
+    """
+    __slots__ = ("name", "field_class", "pattern", "exclude", "shared", "count", "api_with", "pick", "limit")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.api_with = spec.get("api_with")
+        self.field_class = spec.get("field", "any")
+        self.pattern = re.compile(spec["match"]) if "match" in spec else None
+        self.exclude = frozenset(spec.get("exclude", ()))
+        self.shared = bool(spec.get("shared", False))
+        self.count = spec.get("count")
+        self.pick = spec.get("pick", "first")
+        self.limit = spec.get("limit")
+        if self.pick not in ("first", "all"):
+            raise TemplateError(f"Placeholder {name!r}: pick must be 'first' or 'all', not {self.pick!r}")
+
+    def candidates(self, generator, api_name: str, bound: Dict[str, Any]) -> List[Any]:
+        if self.api_with is not None:
+            values = generator.get_apis_with_field(bound[self.api_with], exclude=api_name)
+        else:
+            if self.field_class == "any":
+                fields = generator.get_api_fields(api_name)
+            else:
+                fields = generator.get_fields_by_class(api_name, self.field_class)
+            values = [field for field in fields
+                      if field not in self.exclude
+                      and (self.pattern is None or self.pattern.search(field))
+                      and (not self.shared or len(generator.registry.apis_with_field(field)) > 1)]
+            if self.count is not None:
+                return [tuple(values[:self.count])] if values else []
+        if self.pick == "first":
+            return values[:1]
+        return values[:self.limit] if self.limit is not None else values
+
+
+class CompiledTemplate:
+    """A template compiled into an expansion plan
+
+    Named placeholders are rewritten once into positional ``{0}``, ``{1}``, ...
+    slots so every expanded case shares the same description and PQL strings
+    and only carries its own argument tuple.
+    """
+
+    def __init__(self, spec: Dict[str, Any], field_classes: Iterable[str]):
+        try:
+            self.name = spec["name"]
+            pql = spec["pql"]
+        except KeyError as e:
+            raise TemplateError(f"Template is missing required key {e}") from None
+        self.category = spec.get("category", self.name)
+        self.page = (str(spec.get("limit", DEFAULT_PAGE[0])), str(spec.get("offset", DEFAULT_PAGE[1])))
+        if self.page == DEFAULT_PAGE:
+            self.page = DEFAULT_PAGE
+        self.max_per_api = spec.get("max_per_api")
+
+        self.placeholders = []
+        known_classes = set(field_classes) | {"any"}
+        for name, placeholder_spec in spec.get("placeholders", {}).items():
+            if name in BUILTIN_NAMES:
+                raise TemplateError(f"Template {self.name!r}: {name!r} is a reserved placeholder name")
+            placeholder = Placeholder(name, placeholder_spec)
+            if placeholder.api_with is not None:
+                if placeholder.api_with not in [p.name for p in self.placeholders]:
+                    raise TemplateError(f"Template {self.name!r}: {name!r} refers to {placeholder.api_with!r}, "
+                                        "which must be declared before it")
+            elif placeholder.field_class not in known_classes:
+                raise TemplateError(f"Template {self.name!r}: unknown field class {placeholder.field_class!r}")
+            self.placeholders.append(placeholder)
+
+        positions = {placeholder.name: str(i) for i, placeholder in enumerate(self.placeholders)}
+        self.pql_template = self._positional(pql, positions)
+        self.description_template = self._positional(spec.get("description", self.name + " for {api}"), positions)
+
+    def _positional(self, template: str, positions: Dict[str, str]) -> str:
+        parts = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field_name is None:
+                continue
+            if field_name in positions:
+                field_name = positions[field_name]
+            elif field_name not in BUILTIN_NAMES:
+                raise TemplateError(f"Template {self.name!r}: undeclared placeholder {{{field_name}}}")
+            parts.append("{" + field_name + ("!" + conversion if conversion else "")
+                         + (":" + format_spec if format_spec else "") + "}")
+        return "".join(parts)
+
+    def _bindings(self, generator, api_name: str, bound: Dict[str, Any], depth: int) -> Iterator[Tuple]:
+        if depth == len(self.placeholders):
+            yield tuple(bound[placeholder.name] for placeholder in self.placeholders)
+            return
+        placeholder = self.placeholders[depth]
+        for value in placeholder.candidates(generator, api_name, bound):
+            bound[placeholder.name] = value
+            yield from self._bindings(generator, api_name, bound, depth + 1)
+        bound.pop(placeholder.name, None)
+
+    def expand(self, generator, api_name: str) -> Iterator[TestCase]:
+        """Cases for one API; none if any placeholder has no candidate"""
+        for n, args in enumerate(self._bindings(generator, api_name, {}, 0)):
+            if self.max_per_api is not None and n >= self.max_per_api:
+                return
+            yield TestCase(api_name, self.category, self.description_template, self.pql_template, args, self.page)
+
+
+def load_template_specs(path: str) -> List[Dict[str, Any]]:
+    """Read the raw template list from a JSON or (with PyYAML installed) YAML file"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise TemplateError(f"{path} is a YAML template file but PyYAML is not installed")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    templates = data.get("templates") if isinstance(data, dict) else data
+    if not isinstance(templates, list):
+        raise TemplateError(f"{path} must contain a list of templates (or an object with a 'templates' list)")
+    return templates
+
+
+class TemplateSet:
+    """Templates compiled once and expanded across every API of a generator's schema"""
+
+    def __init__(self, specs: Iterable[Dict[str, Any]], field_classes: Iterable[str]):
+        field_classes = list(field_classes)
+        self.templates = [CompiledTemplate(spec, field_classes) for spec in specs]
+        names = [template.name for template in self.templates]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise TemplateError(f"Duplicate template names: {', '.join(duplicates)}")
+
+    @classmethod
+    def from_file(cls, path: str, field_classes: Iterable[str]) -> "TemplateSet":
+        return cls(load_template_specs(path), field_classes)
+
+    def expand(self, generator, apis: Iterable[str] = None) -> Iterator[TestCase]:
+        """Lazily expand every template over the given APIs (default: all), API by API"""
+        for api_name in (apis if apis is not None else generator.api_map):
+            for template in self.templates:
+                yield from template.expand(generator, api_name)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict
+
+from pql_canon import tokenize
+from transports import Transport, TransportResponse
+
+DEFAULT_CACHE_DB = "pql_response_cache.db"
+# Added to responses served from the cache
+CACHE_HEADER = "X-PQL-Cache"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed);
+"""
+
+
+def cache_key(url: str, body: Dict[str, Any]) -> str:
+    """Hash of (pql, limit, offset, endpoint); headers such as Request-Key are not part of it
+
+    The PQL is only normalized for whitespace and keyword case. Reordering
+    operands or UNION branches (as dedupe canonicalization does) could make
+    two queries share an entry whose rows differ, or differ only in order.
+    """
+    key = "\x1f".join([" ".join(tokenize(body.get("pql", ""))), str(body.get("limit", "")),
+                       str(body.get("offset", "")), url])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """SQLite response store with per-entry TTL and least-recently-used eviction
+
+    ``ttl`` (seconds) bounds how long an entry is served; ``max_entries`` and
+    ``max_bytes`` bound the store, evicting the least recently read entries
+    first. Safe to share between runner threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_DB, ttl: float = 3600, max_entries: int = 10000,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # A cache can lose its last writes on power failure; skip the fsync per entry
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        # Running totals, so bounding the store does not need a table scan per write
+        self._count, self._bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def _delete(self, key: str):
+        row = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count -= 1
+            self._bytes -= row[0]
+
+    def get(self, key: str) -> TransportResponse:
+        """Cached response, or None on a miss or an expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT status_code, headers, body, created FROM responses WHERE key = ?",
+                                    (key,)).fetchone()
+            if row is not None and now - row[3] > self.ttl:
+                with self.conn:
+                    self._delete(key)
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        headers = json.loads(row[1])
+        headers[CACHE_HEADER] = "HIT"
+        return TransportResponse(row[0], headers, row[2])
+
+    def put(self, key: str, response: TransportResponse):
+        now = time.time()
+        headers = json.dumps(dict(response.headers))
+        size = len(response.text) + len(headers)
+        with self._lock, self.conn:
+            self._delete(key)
+            self.conn.execute("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (key, response.status_code, headers, response.text, size, now, now))
+            self._count += 1
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        # Walk entries oldest-read first until both bounds hold again
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self._count -= 1
+            self._bytes -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM responses")
+            self._count = self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self._count, self._bytes
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+class CachingTransport(Transport):
+    """Serves repeated requests from a ResponseCache and stores successful responses from ``inner``
+
+    Only 2xx responses are cached, so errors and throttling are always retried.
+    """
+
+    def __init__(self, inner: Transport, cache: ResponseCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+
+    def post(self, url, headers, body, timeout=30):
+        key = cache_key(url, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.inner.post(url, headers, body, timeout)
+        if 200 <= response.status_code < 300:
+            self.cache.put(key, response)
+        return response
+
+    async def apost(self, url, headers, body, timeout=30):
+        key = cache_key(url, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.inner.apost(url, headers, body, timeout)
+        if 200 <= response.status_code < 300:
+            self.cache.put(key, response)
+        return response
+
+    def close(self):
+        self.inner.close()
+        self.cache.close()
+
+    async def aclose(self):
+        await self.inner.aclose()
+        self.cache.close()
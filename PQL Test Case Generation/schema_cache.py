@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+
+CACHE_VERSION = 2
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_data.py")
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".schema_cache")
+
+
+def _parse_source(source: str) -> Dict[str, Any]:
+    """Read API_SCHEMA out of api_data.py without importing (compiling) the module"""
+    # Only a cache rebuild parses the source; a warm start never pays for importing ast
+    import ast
+
+    with open(source, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=source)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "API_SCHEMA" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"No API_SCHEMA assignment found in {source}")
+
+
+def _source_hash(source: str) -> str:
+    with open(source, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _write_cache(cache_file: str, header: Dict[str, Any], bodies: List[bytes]):
+    """Atomically write the header line followed by one JSON line per API"""
+    offset = 0
+    header["apis"] = []
+    for name, body in zip(header.pop("names"), bodies):
+        header["apis"].append([name, offset, len(body)])
+        offset += len(body)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        f.writelines(bodies)
+    os.replace(tmp_file, cache_file)
+
+
+class LazySchema:
+    """Compiled API schema: API names up front, field lists read from disk on first access"""
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        with open(cache_file, "rb") as f:
+            header_line = f.readline()
+        self.header = json.loads(header_line)
+        self._body_start = len(header_line)
+        self._index = {name: (offset, length) for name, offset, length in self.header["apis"]}
+        self._fields = {}
+
+    @property
+    def source_hash(self) -> str:
+        return self.header["source_hash"]
+
+    def api_names(self) -> List[str]:
+        """API names in schema order, without loading any field lists"""
+        return [name for name, _, _ in self.header["apis"]]
+
+    def __contains__(self, api_name: str) -> bool:
+        return api_name in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_fields(self, api_name: str) -> List[str]:
+        """Field list of one API, read with a single seek on first access"""
+        if api_name not in self._fields:
+            if api_name not in self._index:
+                return []
+            offset, length = self._index[api_name]
+            with open(self.cache_file, "rb") as f:
+                f.seek(self._body_start + offset)
+                self._fields[api_name] = json.loads(f.read(length))
+        return self._fields[api_name]
+
+    def field_index(self) -> Dict[str, List[str]]:
+        """Field -> names of the APIs carrying it, in schema order, without loading field lists"""
+        return self.header["field_index"]
+
+
+def build_cache(source: str = DEFAULT_SOURCE, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Compile api_data.py into the on-disk cache and return the cache file path"""
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = os.path.join(cache_dir, "api_schema.jsonl")
+    schema = _parse_source(source)
+    stat = os.stat(source)
+    # Field -> APIs carrying it, so join lookups need no field lists loaded
+    field_index = {}
+    for item in schema["items"]:
+        for field in dict.fromkeys(item["api_fields"]):
+            field_index.setdefault(field, []).append(item["api_name"])
+    header = {
+        "version": CACHE_VERSION,
+        "source_hash": _source_hash(source),
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "status": schema.get("status"),
+        "message": schema.get("message"),
+        "names": [item["api_name"] for item in schema["items"]],
+        "field_index": field_index,
+    }
+    bodies = [json.dumps(item["api_fields"], separators=(",", ":")).encode("utf-8") + b"\n"
+              for item in schema["items"]]
+    _write_cache(cache_file, header, bodies)
+    return cache_file
+
+
+def load_schema(source: str = DEFAULT_SOURCE, cache_dir: str = DEFAULT_CACHE_DIR) -> LazySchema:
+    """Open the compiled schema, rebuilding it when api_data.py has changed
+
+    The cache is trusted when the source's mtime and size match. Otherwise the
+    source is hashed: if the content is unchanged only the stored mtime is
+    refreshed, else the cache is rebuilt from the source.
+    """
+    cache_file = os.path.join(cache_dir, "api_schema.jsonl")
+    stat = os.stat(source)
+    try:
+        schema = LazySchema(cache_file)
+    except (OSError, ValueError, KeyError):
+        return LazySchema(build_cache(source, cache_dir))
+
+    header = schema.header
+    if header.get("version") != CACHE_VERSION:
+        return LazySchema(build_cache(source, cache_dir))
+    if header.get("source_mtime_ns") == stat.st_mtime_ns and header.get("source_size") == stat.st_size:
+        return schema
+    if header.get("source_hash") != _source_hash(source):
+        return LazySchema(build_cache(source, cache_dir))
+
+    # Same content, new mtime (e.g. after a checkout): refresh the header only
+    with open(cache_file, "rb") as f:
+        f.seek(schema._body_start)
+        bodies = f.readlines()
+    header = dict(header, source_mtime_ns=stat.st_mtime_ns, source_size=stat.st_size,
+                  names=schema.api_names())
+    header.pop("apis")
+    _write_cache(cache_file, header, bodies)
+    return LazySchema(cache_file)
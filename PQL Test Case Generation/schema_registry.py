@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from schema_cache import DEFAULT_CACHE_DIR, DEFAULT_SOURCE, LazySchema, load_schema
+
+
+class ApiRecord:
+    """One API of the schema: interned name, ordered field tuple and O(1) field membership"""
+    __slots__ = ("name", "fields", "field_set")
+
+    def __init__(self, name: str, fields: Iterable[str]):
+        self.name = sys.intern(name)
+        self.fields = tuple(sys.intern(field) for field in fields)
+        self.field_set = frozenset(self.fields)
+
+    def has_field(self, field: str) -> bool:
+        return field in self.field_set
+
+    def __repr__(self) -> str:
+        return f"ApiRecord({self.name!r}, {len(self.fields)} fields)"
+
+
+class SchemaRegistry:
+    """Compact, read-only API schema shared by the generator, the UI and the runners
+
+    Built from a compiled LazySchema (``from_lazy_schema``), API records are
+    read from disk the first time they are needed, and field -> API lookups
+    use the index compiled into the cache. Checking a query against a couple
+    of APIs therefore loads only those APIs. Iterating the registry loads
+    everything.
+    """
+
+    def __init__(self, records: Iterable[ApiRecord], source_hash: str = None):
+        self._records = {record.name: record for record in records}
+        self._names = list(self._records)
+        self._schema = None
+        self._field_index = None
+        self.schema_hash = source_hash or self._compute_hash()
+
+    @classmethod
+    def from_api_schema(cls, api_schema: Dict[str, Any], source_hash: str = None) -> "SchemaRegistry":
+        """Build a registry from a dict shaped like api_data.API_SCHEMA"""
+        records = (ApiRecord(item['api_name'], item['api_fields']) for item in api_schema['items'])
+        return cls(records, source_hash)
+
+    @classmethod
+    def from_lazy_schema(cls, schema: LazySchema) -> "SchemaRegistry":
+        """Registry over the compiled schema cache that loads API records on first access"""
+        registry = cls((), schema.source_hash)
+        registry._schema = schema
+        registry._names = schema.api_names()
+        return registry
+
+    def _record(self, api_name: str) -> ApiRecord:
+        record = self._records.get(api_name)
+        if record is None and self._schema is not None and api_name in self._schema:
+            record = self._records.setdefault(api_name, ApiRecord(api_name, self._schema.get_fields(api_name)))
+        return record
+
+    def _compute_hash(self) -> str:
+        payload = json.dumps([[r.name, r.fields] for r in self], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def records(self) -> Dict[str, ApiRecord]:
+        """Every API record by name, in schema order (loads all of them)"""
+        return {record.name: record for record in self}
+
+    @property
+    def field_index(self) -> Dict[str, Tuple[str, ...]]:
+        """Field -> APIs carrying it, in schema order"""
+        if self._field_index is None:
+            if self._schema is not None:
+                index = self._schema.field_index()
+            else:
+                index = {}
+                for record in self:
+                    for field in dict.fromkeys(record.fields):
+                        index.setdefault(field, []).append(record.name)
+            self._field_index = {sys.intern(field): tuple(apis) for field, apis in index.items()}
+        return self._field_index
+
+    def __contains__(self, api_name: str) -> bool:
+        return api_name in self._records or (self._schema is not None and api_name in self._schema)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[ApiRecord]:
+        return (self._record(api_name) for api_name in self._names)
+
+    def api_names(self) -> list:
+        return list(self._names)
+
+    def get(self, api_name: str) -> ApiRecord:
+        return self._record(api_name)
+
+    def fields(self, api_name: str) -> Tuple[str, ...]:
+        record = self._record(api_name)
+        return record.fields if record else ()
+
+    def has_field(self, api_name: str, field: str) -> bool:
+        record = self._record(api_name)
+        return record is not None and field in record.field_set
+
+    def apis_with_field(self, field: str) -> Tuple[str, ...]:
+        return self.field_index.get(field, ())
+
+
+class ApiFieldMap(Mapping):
+    """Read-only ``{api_name: fields}`` view of a registry; field tuples load on access"""
+
+    def __init__(self, registry: SchemaRegistry):
+        self.registry = registry
+
+    def __getitem__(self, api_name: str) -> Tuple[str, ...]:
+        record = self.registry.get(api_name)
+        if record is None:
+            raise KeyError(api_name)
+        return record.fields
+
+    def __contains__(self, api_name: object) -> bool:
+        return api_name in self.registry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.api_names())
+
+    def __len__(self) -> int:
+        return len(self.registry)
+
+
+# (source, cache_dir, mtime_ns, size) -> registry of the last get_registry call
+_shared_key = None
+_shared_registry = None
+
+
+def get_registry(source: str = DEFAULT_SOURCE, cache_dir: str = DEFAULT_CACHE_DIR) -> SchemaRegistry:
+    """Process-wide registry for api_data.py, rebuilt only when the source changes
+
+    Repeated calls only stat the source; the cache header is read again when
+    its mtime or size differs from the previous call.
+    """
+    global _shared_key, _shared_registry
+    stat = os.stat(source)
+    key = (os.path.abspath(source), os.path.abspath(cache_dir), stat.st_mtime_ns, stat.st_size)
+    if _shared_registry is not None and key == _shared_key:
+        return _shared_registry
+    schema = load_schema(source, cache_dir)
+    if _shared_registry is None or _shared_registry.schema_hash != schema.source_hash:
+        _shared_registry = SchemaRegistry.from_lazy_schema(schema)
+    _shared_key = key
+    return _shared_registry
@@ -0,0 +1,93 @@
+from typing import Any, Dict, Tuple
+
+# Request paging shared by reference across every case that uses the defaults
+DEFAULT_PAGE = ("50", "0")
+
+
+class TestCase:
+    """Compact test case record rendered to the legacy dict format on demand
+
+    ``description`` and ``pql`` are format templates shared between cases;
+    ``args`` holds the per-case field references. A tuple argument renders as
+    a ``[api.field], ...`` projection of the case's API. ``{api}``, ``{limit}``
+    and ``{offset}`` are always available to templates. With ``args=None``
+    the templates are used literally (e.g. cases loaded from older files).
+    """
+    __slots__ = ("api", "category", "description_template", "pql_template", "args", "page")
+
+    def __init__(self, api: str, category: str, description: str, pql: str,
+                 args: Tuple = (), page: Tuple[str, str] = DEFAULT_PAGE):
+        self.api = api
+        self.category = category
+        self.description_template = description
+        self.pql_template = pql
+        self.args = args
+        self.page = page
+
+    def _render(self, template: str) -> str:
+        if self.args is None:
+            return template
+        values = [", ".join(f"[{self.api}.{field}]" for field in arg) if isinstance(arg, tuple) else arg
+                  for arg in self.args]
+        return template.format(*values, api=self.api, limit=self.page[0], offset=self.page[1])
+
+    @property
+    def description(self) -> str:
+        return self._render(self.description_template)
+
+    @property
+    def pql(self) -> str:
+        return self._render(self.pql_template)
+
+    @property
+    def limit(self) -> str:
+        return self.page[0]
+
+    @property
+    def offset(self) -> str:
+        return self.page[1]
+
+    @property
+    def request_body(self) -> Dict[str, str]:
+        return {"pql": self.pql, "limit": self.page[0], "offset": self.page[1]}
+
+    def to_dict(self, include_meta: bool = False) -> Dict[str, Any]:
+        """Legacy {"test_case", "request_body"} dict, optionally tagged with api_name and category"""
+        result = {"api_name": self.api, "category": self.category} if include_meta else {}
+        result["test_case"] = self.description
+        result["request_body"] = self.request_body
+        return result
+
+    # Read-only mapping access so code written against the dict format keeps working
+    _KEYS = {
+        "api_name": lambda case: case.api,
+        "category": lambda case: case.category,
+        "test_case": lambda case: case.description,
+        "request_body": lambda case: case.request_body,
+    }
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return self._KEYS[key](self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self._KEYS else default
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TestCase):
+            return NotImplemented
+        return self.to_dict(include_meta=True) == other.to_dict(include_meta=True)
+
+    def __hash__(self) -> int:
+        return hash((self.api, self.category, self.description, self.pql, self.page))
+
+    def __repr__(self) -> str:
+        return f"TestCase({self.api!r}, {self.category!r}, {self.description!r})"
+
+
+def as_dict(test_case: Any, include_meta: bool = True) -> Dict[str, Any]:
+    """Serializable dict for a TestCase or an already-plain case dict"""
+    if isinstance(test_case, TestCase):
+        return test_case.to_dict(include_meta)
+    return test_case
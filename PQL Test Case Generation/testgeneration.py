@@ -1,17 +1,145 @@
+import argparse
 import json
+import os
 import random
-from typing import List, Dict, Any
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_right
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Union
+
+from catalog_io import iter_cases, open_catalog, write_jsonl
+from catalog_manifest import diff_fields, files_fingerprint, fingerprint, load_manifest, save_manifest
+from catalog_store import DEFAULT_DB, CatalogStore, is_catalog_db
+from coverage import FieldCoverage, minimize_suite
+from join_graph import JoinGraph
+from pairwise import pairwise_cover
+from pql_canon import Deduplicator, case_hash
+from pql_cost import CostModel, read_observations, split_tiers, within_budget
+from pql_parser import PQLValidator
+from pql_templates import DEFAULT_TEMPLATES, TemplateSet
+from schema_registry import ApiFieldMap, SchemaRegistry, get_registry
+from test_case import TestCase, as_dict
 
 class PQLTestGenerator:
-    def __init__(self, api_schema: Dict[str, Any]):
+    # Keyword lists used to classify fields by name, keyed by field class
+    FIELD_CLASSES = {
+        "numeric": ['amount', 'balance', 'number', 'total', 'estimate'],
+        "comparable": ['amount', 'id', 'number'],
+        "measure": ['amount', 'total', 'estimate'],
+        "text": ['name', 'description', 'type'],
+        "groupable": ['type', 'id'],
+        "date": ['date', 'time'],
+    }
+    # Shared keys used to pair APIs, in order of preference
+    JOIN_KEYS = ['practice_id', 'cust_id', 'guarantor_id']
+    SUBQUERY_KEYS = ['practice_id', 'cust_id']
+    UNION_KEYS = ['practice_id']
+    # Cross-API case kinds for exhaustive pair enumeration: (shared keys, case builder)
+    PAIR_KINDS = {
+        "join": (JOIN_KEYS, "_join_case"),
+        "subquery": (SUBQUERY_KEYS, "_exists_case"),
+        "union": (UNION_KEYS, "_union_case"),
+    }
+    # LEFT JOIN and EXISTS depend on which API is outer; UNION does not
+    ORDERED_PAIR_KINDS = ("join", "subquery")
+    # Dimensions for the pairwise (all-pairs) sampler besides the API itself;
+    # shape templates take the field as {0} and the WHERE predicate as {1}
+    PAIRWISE_SHAPES = {
+        "select": "SELECT [{api}.{0}] FROM [{api}] WHERE [{api}.{0}] {1}",
+        "distinct": "SELECT DISTINCT [{api}.{0}] FROM [{api}] WHERE [{api}.{0}] {1}",
+        "count": "SELECT COUNT([{api}.{0}]) FROM [{api}] WHERE [{api}.{0}] {1}",
+        "order_by": "SELECT [{api}.{0}] FROM [{api}] WHERE [{api}.{0}] {1} ORDER BY [{api}.{0}]",
+    }
+    PAIRWISE_FIELD_PICKS = ["first", "last", "numeric", "text", "random"]
+    # Operator -> (predicate for numeric-looking fields, predicate for other fields)
+    PAIRWISE_OPERATORS = {
+        "=": ("= 1", "= 'test'"),
+        ">": ("> 1000", "> 'A'"),
+        "<>": ("<> 0", "<> ''"),
+        "IN": ("IN (1, 2, 3)", "IN ('A', 'B', 'C')"),
+        "LIKE": ("LIKE '%1%'", "LIKE '%est%'"),
+        "BETWEEN": ("BETWEEN 100 AND 1000", "BETWEEN 'A' AND 'M'"),
+        "IS NOT NULL": ("IS NOT NULL", "IS NOT NULL"),
+    }
+    PAIRWISE_PAGES = [("50", "0"), ("10", "0"), ("100", "100"), ("1", "0")]
+    # Test case categories, in generation order, mapped to their generator methods
+    CATEGORIES = {
+        "basic_select": "generate_basic_select_cases",
+        "aggregation": "generate_aggregation_cases",
+        "where_clause": "generate_where_clause_cases",
+        "like": "generate_like_cases",
+        "join": "generate_join_cases",
+        "group_by_having": "generate_group_by_having_cases",
+        "subquery": "generate_subquery_cases",
+        "union": "generate_union_cases",
+    }
+
+    def __init__(self, api_schema: Union[Dict[str, Any], SchemaRegistry], cache_size: int = 128):
+        # Memoized per-API suites, least recently used first
+        self.cache_size = cache_size
+        self._case_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.set_schema(api_schema)
+    
+    def set_schema(self, api_schema: Union[Dict[str, Any], SchemaRegistry]):
+        """(Re)load the schema, rebuilding the indexes and invalidating memoized suites"""
         self.api_schema = api_schema
-        self.api_map = {item['api_name']: item['api_fields'] for item in api_schema['items']}
+        if isinstance(api_schema, SchemaRegistry):
+            self.registry = api_schema
+        else:
+            self.registry = SchemaRegistry.from_api_schema(api_schema)
+        # API -> fields; records are only read from the schema cache when an API is used
+        self.api_map = ApiFieldMap(self.registry)
+        # Per-API field classes, computed on first use
+        self.field_classes = {}
+        self._join_graph = None
+        self.invalidate_cache()
+    
+    @property
+    def field_index(self) -> Dict[str, Tuple[str, ...]]:
+        """Field -> APIs carrying it, in schema order (shared with the registry)"""
+        return self.registry.field_index
     
-    def get_api_fields(self, api_name: str) -> List[str]:
+    def _classify(self, api_name: str) -> Dict[str, Tuple[str, ...]]:
+        """Classify an API's fields once"""
+        record = self.registry.get(api_name)
+        if record is None:
+            return {}
+        classes = {name: [] for name in self.FIELD_CLASSES}
+        for field in record.fields:
+            lowered = field.lower()
+            for name, keywords in self.FIELD_CLASSES.items():
+                if any(keyword in lowered for keyword in keywords):
+                    classes[name].append(field)
+        classes["join_key"] = [f for f in self.JOIN_KEYS if f in record.field_set]
+        self.field_classes[api_name] = {name: tuple(fields) for name, fields in classes.items()}
+        return self.field_classes[api_name]
+    
+    def get_api_fields(self, api_name: str) -> Tuple[str, ...]:
         """Get fields for a specific API"""
-        return self.api_map.get(api_name, [])
+        return self.registry.fields(api_name)
+    
+    def get_fields_by_class(self, api_name: str, field_class: str) -> Tuple[str, ...]:
+        """Get the fields of an API that fall into a precomputed field class"""
+        classes = self.field_classes.get(api_name)
+        if classes is None:
+            classes = self._classify(api_name)
+        return classes.get(field_class, ())
+    
+    def get_apis_with_field(self, field: str, exclude: str = None, limit: int = None) -> List[str]:
+        """Get APIs (in schema order) that carry a field, optionally excluding one"""
+        apis = (api for api in self.registry.apis_with_field(field) if api != exclude)
+        return list(islice(apis, limit))
+    
+    def _first_shared_key(self, api_name: str, keys: List[str]) -> str:
+        """Return the first of the given keys present in an API, or None"""
+        fields = self.get_fields_by_class(api_name, "join_key")
+        return next((key for key in keys if key in fields), None)
     
-    def generate_basic_select_cases(self, api_name: str) -> List[Dict]:
+    def generate_basic_select_cases(self, api_name: str) -> List[TestCase]:
         """Generate basic SELECT test cases"""
         fields = self.get_api_fields(api_name)
         if not fields:
@@ -19,283 +147,416 @@ class PQLTestGenerator:
         
         test_cases = []
         
-        # Case 1: Select all fields
-        all_fields = ", ".join([f"[{api_name}.{field}]" for field in fields])
-        test_cases.append({
-            "test_case": f"Basic SELECT all fields from {api_name}",
-            "request_body": {
-                "pql": f"SELECT {all_fields} FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
+        # Case 1: Select all fields (the field tuple is shared with the registry, not copied)
+        test_cases.append(TestCase(
+            api_name, "basic_select",
+            "Basic SELECT all fields from {api}",
+            "SELECT {0} FROM [{api}]",
+            (fields,)
+        ))
         
         # Case 2: Select specific fields
         sample_fields = fields[:3]  # Take first 3 fields
-        selected_fields = ", ".join([f"[{api_name}.{field}]" for field in sample_fields])
-        test_cases.append({
-            "test_case": f"SELECT specific fields from {api_name}",
-            "request_body": {
-                "pql": f"SELECT {selected_fields} FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
+        test_cases.append(TestCase(
+            api_name, "basic_select",
+            "SELECT specific fields from {api}",
+            "SELECT {0} FROM [{api}]",
+            (sample_fields,)
+        ))
         
         # Case 3: SELECT DISTINCT
         distinct_field = fields[0] if fields else "practice_id"
-        test_cases.append({
-            "test_case": f"SELECT DISTINCT from {api_name}",
-            "request_body": {
-                "pql": f"SELECT DISTINCT [{api_name}.{distinct_field}],{selected_fields} FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
+        test_cases.append(TestCase(
+            api_name, "basic_select",
+            "SELECT DISTINCT from {api}",
+            "SELECT DISTINCT [{api}.{0}],{1} FROM [{api}]",
+            (distinct_field, sample_fields)
+        ))
         
         return test_cases
     
-    def generate_aggregation_cases(self, api_name: str) -> List[Dict]:
+    def generate_aggregation_cases(self, api_name: str) -> List[TestCase]:
         """Generate aggregation function test cases"""
-        fields = self.get_api_fields(api_name)
-        numeric_fields = [f for f in fields if any(keyword in f.lower() for keyword in ['amount', 'balance', 'number', 'total', 'estimate'])]
+        numeric_fields = self.get_fields_by_class(api_name, "numeric")
         
         if not numeric_fields:
             return []
         
-        test_cases = []
-        
-        # COUNT
-        test_cases.append({
-            "test_case": f"COUNT aggregation for {api_name}",
-            "request_body": {
-                "pql": f"SELECT COUNT([{api_name}.{numeric_fields[0]}]) FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
-        
-        # SUM
-        test_cases.append({
-            "test_case": f"SUM aggregation for {api_name}",
-            "request_body": {
-                "pql": f"SELECT SUM([{api_name}.{numeric_fields[0]}]) FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
-        
-        # AVG
-        test_cases.append({
-            "test_case": f"AVG aggregation for {api_name}",
-            "request_body": {
-                "pql": f"SELECT AVG([{api_name}.{numeric_fields[0]}]) FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
-        
-        # MIN/MAX
-        test_cases.append({
-            "test_case": f"MIN and MAX aggregation for {api_name}",
-            "request_body": {
-                "pql": f"SELECT MIN([{api_name}.{numeric_fields[0]}]), MAX([{api_name}.{numeric_fields[0]}]) FROM [{api_name}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
-        
-        return test_cases
+        args = (numeric_fields[0],)
+        return [
+            # COUNT
+            TestCase(api_name, "aggregation", "COUNT aggregation for {api}",
+                     "SELECT COUNT([{api}.{0}]) FROM [{api}]", args),
+            # SUM
+            TestCase(api_name, "aggregation", "SUM aggregation for {api}",
+                     "SELECT SUM([{api}.{0}]) FROM [{api}]", args),
+            # AVG
+            TestCase(api_name, "aggregation", "AVG aggregation for {api}",
+                     "SELECT AVG([{api}.{0}]) FROM [{api}]", args),
+            # MIN/MAX
+            TestCase(api_name, "aggregation", "MIN and MAX aggregation for {api}",
+                     "SELECT MIN([{api}.{0}]), MAX([{api}.{0}]) FROM [{api}]", args),
+        ]
     
-    def generate_where_clause_cases(self, api_name: str) -> List[Dict]:
+    def generate_where_clause_cases(self, api_name: str) -> List[TestCase]:
         """Generate WHERE clause test cases"""
         fields = self.get_api_fields(api_name)
         if not fields:
             return []
         
         test_cases = []
-        sample_fields = fields[:2]
         
         # Basic WHERE with numeric field
-        numeric_fields = [f for f in fields if any(keyword in f.lower() for keyword in ['amount', 'id', 'number'])]
+        numeric_fields = self.get_fields_by_class(api_name, "comparable")
         if numeric_fields:
-            test_cases.append({
-                "test_case": f"WHERE clause with numeric condition for {api_name}",
-                "request_body": {
-                    "pql": f"SELECT [{api_name}.{sample_fields[0]}] FROM [{api_name}] WHERE [{api_name}.{numeric_fields[0]}] > 1000",
-                    "limit": "50",
-                    "offset": "0"
-                }
-            })
+            test_cases.append(TestCase(
+                api_name, "where_clause",
+                "WHERE clause with numeric condition for {api}",
+                "SELECT [{api}.{0}] FROM [{api}] WHERE [{api}.{1}] > 1000",
+                (fields[0], numeric_fields[0])
+            ))
         
         # WHERE with IN clause
-        test_cases.append({
-            "test_case": f"WHERE IN clause for {api_name}",
-            "request_body": {
-                "pql": f"SELECT [{api_name}.{sample_fields[0]}] FROM [{api_name}] WHERE [{api_name}.{sample_fields[0]}] IN (1, 2, 3)",
-                "limit": "50",
-                "offset": "0"
-            }
-        })
+        test_cases.append(TestCase(
+            api_name, "where_clause",
+            "WHERE IN clause for {api}",
+            "SELECT [{api}.{0}] FROM [{api}] WHERE [{api}.{0}] IN (1, 2, 3)",
+            (fields[0],)
+        ))
         
         # WHERE with BETWEEN
         if numeric_fields:
-            test_cases.append({
-                "test_case": f"WHERE BETWEEN clause for {api_name}",
-                "request_body": {
-                    "pql": f"SELECT [{api_name}.{sample_fields[0]}] FROM [{api_name}] WHERE [{api_name}.{numeric_fields[0]}] BETWEEN 100 AND 1000",
-                    "limit": "50",
-                    "offset": "0"
-                }
-            })
+            test_cases.append(TestCase(
+                api_name, "where_clause",
+                "WHERE BETWEEN clause for {api}",
+                "SELECT [{api}.{0}] FROM [{api}] WHERE [{api}.{1}] BETWEEN 100 AND 1000",
+                (fields[0], numeric_fields[0])
+            ))
         
         return test_cases
     
-    def generate_like_cases(self, api_name: str) -> List[Dict]:
+    def generate_like_cases(self, api_name: str) -> List[TestCase]:
         """Generate LIKE operator test cases"""
-        fields = self.get_api_fields(api_name)
-        text_fields = [f for f in fields if any(keyword in f.lower() for keyword in ['name', 'description', 'type'])]
+        text_fields = self.get_fields_by_class(api_name, "text")
         
         if not text_fields:
             return []
         
-        return [{
-            "test_case": f"LIKE operator for {api_name}",
-            "request_body": {
-                "pql": f"SELECT [{api_name}.{text_fields[0]}] FROM [{api_name}] WHERE [{api_name}.{text_fields[0]}] LIKE '%est%'",
-                "limit": "50",
-                "offset": "0"
-            }
-        }]
+        return [TestCase(
+            api_name, "like",
+            "LIKE operator for {api}",
+            "SELECT [{api}.{0}] FROM [{api}] WHERE [{api}.{0}] LIKE '%est%'",
+            (text_fields[0],)
+        )]
     
-    def generate_join_cases(self, api_name: str) -> List[Dict]:
+    def generate_join_cases(self, api_name: str) -> List[TestCase]:
         """Generate JOIN test cases with other APIs"""
-        fields = self.get_api_fields(api_name)
-        common_join_fields = ['practice_id', 'cust_id', 'guarantor_id']
-        
-        available_join_fields = [f for f in common_join_fields if f in fields]
-        if not available_join_fields:
+        join_field = self._first_shared_key(api_name, self.JOIN_KEYS)
+        if not join_field:
             return []
         
-        join_field = available_join_fields[0]
-        
-        # Find other APIs that have the same join field
-        other_apis = []
-        for other_api, other_fields in self.api_map.items():
-            if other_api != api_name and join_field in other_fields:
-                other_apis.append(other_api)
-        
-        test_cases = []
-        for other_api in other_apis[:2]:  # Limit to 2 joins to avoid too many cases
-            test_cases.append({
-                "test_case": f"LEFT JOIN between {api_name} and {other_api}",
-                "request_body": {
-                    "pql": f"SELECT [{api_name}.{fields[0]}], [{other_api}.{self.get_api_fields(other_api)[0]}] FROM [{api_name}] LEFT JOIN [{other_api}] ON [{api_name}.{join_field}] = [{other_api}.{join_field}]",
-                    "limit": "50",
-                    "offset": "0"
-                }
-            })
+        # Find other APIs that have the same join field (limit to 2 joins to avoid too many cases)
+        other_apis = self.get_apis_with_field(join_field, exclude=api_name, limit=2)
         
-        return test_cases
+        return [self._join_case(api_name, other_api, join_field) for other_api in other_apis]
+    
+    def _join_case(self, api_name: str, other_api: str, join_field: str) -> TestCase:
+        """Build a LEFT JOIN case between two APIs sharing join_field"""
+        return TestCase(
+            api_name, "join",
+            "LEFT JOIN between {api} and {0}",
+            "SELECT [{api}.{1}], [{0}.{2}] FROM [{api}] LEFT JOIN [{0}] ON [{api}.{3}] = [{0}.{3}]",
+            (other_api, self.get_api_fields(api_name)[0], self.get_api_fields(other_api)[0], join_field)
+        )
     
-    def generate_group_by_having_cases(self, api_name: str) -> List[Dict]:
+    def generate_group_by_having_cases(self, api_name: str) -> List[TestCase]:
         """Generate GROUP BY and HAVING test cases"""
-        fields = self.get_api_fields(api_name)
-        groupable_fields = [f for f in fields if any(keyword in f.lower() for keyword in ['type', 'id'])]
-        numeric_fields = [f for f in fields if any(keyword in f.lower() for keyword in ['amount', 'total', 'estimate'])]
+        groupable_fields = self.get_fields_by_class(api_name, "groupable")
+        numeric_fields = self.get_fields_by_class(api_name, "measure")
         
         if not groupable_fields or not numeric_fields:
             return []
         
-        return [{
-            "test_case": f"GROUP BY and HAVING for {api_name}",
-            "request_body": {
-                "pql": f"SELECT [{api_name}.{groupable_fields[0]}], SUM([{api_name}.{numeric_fields[0]}]) FROM [{api_name}] GROUP BY [{api_name}.{groupable_fields[0]}] HAVING SUM([{api_name}.{numeric_fields[0]}]) > 1000",
-                "limit": "50",
-                "offset": "0"
-            }
-        }]
+        return [TestCase(
+            api_name, "group_by_having",
+            "GROUP BY and HAVING for {api}",
+            "SELECT [{api}.{0}], SUM([{api}.{1}]) FROM [{api}] GROUP BY [{api}.{0}] HAVING SUM([{api}.{1}]) > 1000",
+            (groupable_fields[0], numeric_fields[0])
+        )]
     
-    def generate_subquery_cases(self, api_name: str) -> List[Dict]:
+    def generate_subquery_cases(self, api_name: str) -> List[TestCase]:
         """Generate subquery test cases"""
-        fields = self.get_api_fields(api_name)
-        common_fields = ['practice_id', 'cust_id']
-        
-        available_common_fields = [f for f in common_fields if f in fields]
-        if not available_common_fields:
+        common_field = self._first_shared_key(api_name, self.SUBQUERY_KEYS)
+        if not common_field:
             return []
         
-        common_field = available_common_fields[0]
-        
         # Find another API for subquery
-        other_apis = []
-        for other_api, other_fields in self.api_map.items():
-            if other_api != api_name and common_field in other_fields:
-                other_apis.append(other_api)
+        other_apis = self.get_apis_with_field(common_field, exclude=api_name, limit=1)
         
         if not other_apis:
             return []
         
-        other_api = other_apis[0]
-        
-        return [{
-            "test_case": f"EXISTS subquery for {api_name}",
-            "request_body": {
-                "pql": f"SELECT [{api_name}.{fields[0]}] FROM [{api_name}] WHERE EXISTS (SELECT 1 FROM [{other_api}] WHERE [{other_api}.{common_field}] = [{api_name}.{common_field}])",
-                "limit": "50",
-                "offset": "0"
-            }
-        }]
+        return [self._exists_case(api_name, other_apis[0], common_field)]
     
-    def generate_union_cases(self, api_name: str) -> List[Dict]:
+    def _exists_case(self, api_name: str, other_api: str, common_field: str) -> TestCase:
+        """Build an EXISTS subquery case correlating two APIs on common_field"""
+        return TestCase(
+            api_name, "subquery",
+            "EXISTS subquery for {api}",
+            "SELECT [{api}.{1}] FROM [{api}] WHERE EXISTS (SELECT 1 FROM [{0}] WHERE [{0}.{2}] = [{api}.{2}])",
+            (other_api, self.get_api_fields(api_name)[0], common_field)
+        )
+    
+    def generate_union_cases(self, api_name: str) -> List[TestCase]:
         """Generate UNION test cases"""
-        fields = self.get_api_fields(api_name)
-        common_fields = ['practice_id']
-        
-        available_common_fields = [f for f in common_fields if f in fields]
-        if not available_common_fields:
+        common_field = self._first_shared_key(api_name, self.UNION_KEYS)
+        if not common_field:
             return []
         
-        common_field = available_common_fields[0]
-        
         # Find another API for UNION
-        other_apis = []
-        for other_api, other_fields in self.api_map.items():
-            if other_api != api_name and common_field in other_fields:
-                other_apis.append(other_api)
+        other_apis = self.get_apis_with_field(common_field, exclude=api_name, limit=1)
         
         if not other_apis:
             return []
         
-        other_api = other_apis[0]
+        return [self._union_case(api_name, other_apis[0], common_field)]
+    
+    def _union_case(self, api_name: str, other_api: str, common_field: str) -> TestCase:
+        """Build a UNION case over common_field from two APIs"""
+        return TestCase(
+            api_name, "union",
+            "UNION between {api} and {0}",
+            "SELECT [{api}.{1}] FROM [{api}] UNION SELECT [{0}.{1}] FROM [{0}]",
+            (other_api, common_field)
+        )
+    
+    def plan_pair_sample(self, budget: int = None, kinds: Iterable[str] = None,
+                         apis: Iterable[str] = None, seed: int = 0) -> List[Dict]:
+        """Plan which API pairs to emit in exhaustive pair mode
+        
+        Every pair of APIs sharing a key is a candidate, read from the field index
+        without enumerating pairs up front: ordered pairs (n * (n - 1)) for the
+        direction-dependent join and subquery kinds, unordered pairs for union.
+        Candidates are stratified
+        by (kind, key); when the total exceeds ``budget`` each stratum gets a
+        proportional share and pairs are sampled uniformly (seeded) within it.
+        Each stratum records how many pairs were skipped.
+        """
+        kinds = list(self.PAIR_KINDS) if kinds is None else list(kinds)
+        unknown = [kind for kind in kinds if kind not in self.PAIR_KINDS]
+        if unknown:
+            raise ValueError(f"Unknown pair kinds: {', '.join(unknown)}. Valid kinds: {', '.join(self.PAIR_KINDS)}")
+        allowed = None if apis is None else set(apis)
         
-        return [{
-            "test_case": f"UNION between {api_name} and {other_api}",
-            "request_body": {
-                "pql": f"SELECT [{api_name}.{common_field}] FROM [{api_name}] UNION SELECT [{other_api}.{common_field}] FROM [{other_api}]",
-                "limit": "50",
-                "offset": "0"
-            }
-        }]
+        strata = []
+        for kind in kinds:
+            keys, _ = self.PAIR_KINDS[kind]
+            for key in keys:
+                key_apis = [api for api in self.registry.apis_with_field(key) if allowed is None or api in allowed]
+                ordered = kind in self.ORDERED_PAIR_KINDS
+                total = len(key_apis) * (len(key_apis) - 1) // (1 if ordered else 2)
+                if total:
+                    strata.append({"kind": kind, "key": key, "apis": key_apis, "ordered": ordered,
+                                   "total_pairs": total})
+        
+        quotas = _allocate_budget([stratum["total_pairs"] for stratum in strata], budget)
+        rng = random.Random(seed)
+        for stratum, quota in zip(strata, quotas):
+            total = stratum["total_pairs"]
+            stratum["selected"] = range(total) if quota >= total else sorted(rng.sample(range(total), quota))
+            stratum["skipped"] = total - len(stratum["selected"])
+        return strata
     
-    def generate_all_test_cases(self, api_name: str) -> List[Dict]:
-        """Generate all types of test cases for a given API"""
+    def iter_pair_cases(self, plan: List[Dict]) -> Iterator[TestCase]:
+        """Lazily build the cases selected by plan_pair_sample"""
+        for stratum in plan:
+            apis, key = stratum["apis"], stratum["key"]
+            build_case = getattr(self, self.PAIR_KINDS[stratum["kind"]][1])
+            if stratum["ordered"]:
+                # Rank r is (i, j) with i = r // (n - 1), j skipping i itself
+                others = len(apis) - 1
+                for rank in stratum["selected"]:
+                    i, k = divmod(rank, others)
+                    yield build_case(apis[i], apis[k + (k >= i)], key)
+                continue
+            offsets = _pair_offsets(len(apis))
+            for rank in stratum["selected"]:
+                i = bisect_right(offsets, rank) - 1
+                j = i + 1 + rank - offsets[i]
+                yield build_case(apis[i], apis[j], key)
+    
+    def generate_exhaustive_pair_cases(self, budget: int = None, kinds: Iterable[str] = None,
+                                       apis: Iterable[str] = None, seed: int = 0) -> Tuple[List[TestCase], List[Dict]]:
+        """Generate JOIN/EXISTS/UNION cases for every API pair sharing a key, within a budget
+        
+        Returns the cases and a per-stratum report of total, emitted and skipped pairs.
+        """
+        plan = self.plan_pair_sample(budget, kinds, apis, seed)
+        return list(self.iter_pair_cases(plan)), pair_plan_report(plan)
+    
+    def generate_pairwise_cases(self, apis: Iterable[str] = None, seed: int = 0) -> List[TestCase]:
+        """Generate a seeded covering array of cases hitting every pair of dimension values
+        
+        Dimensions are the API, query shape, field pick, WHERE operator and
+        limit/offset page. Every pair of values from any two dimensions appears in
+        at least one case, with far fewer cases than the full cross product.
+        """
+        apis = list(self.api_map) if apis is None else [api for api in apis if api in self.api_map]
+        rows = pairwise_cover({
+            "api": apis,
+            "shape": list(self.PAIRWISE_SHAPES),
+            "field": self.PAIRWISE_FIELD_PICKS,
+            "operator": list(self.PAIRWISE_OPERATORS),
+            "page": self.PAIRWISE_PAGES,
+        }, seed=seed)
+        rng = random.Random(seed)
+        return [self._pairwise_case(row, rng) for row in rows]
+    
+    def _pick_field(self, api_name: str, pick: str, rng: random.Random) -> str:
+        """Resolve a pairwise field pick to a concrete field of the API"""
+        fields = self.get_api_fields(api_name)
+        if pick == "last":
+            return fields[-1]
+        if pick == "random":
+            return rng.choice(fields)
+        if pick == "numeric":
+            candidates = self.get_fields_by_class(api_name, "numeric") or self.get_fields_by_class(api_name, "comparable")
+            return candidates[0] if candidates else fields[0]
+        if pick == "text":
+            candidates = self.get_fields_by_class(api_name, "text")
+            return candidates[0] if candidates else fields[0]
+        return fields[0]
+    
+    def _pairwise_case(self, row: Dict, rng: random.Random) -> TestCase:
+        """Render one covering-array row as a test case"""
+        api_name = row["api"]
+        field = self._pick_field(api_name, row["field"], rng)
+        looks_numeric = (field in self.get_fields_by_class(api_name, "numeric")
+                         or field in self.get_fields_by_class(api_name, "comparable"))
+        numeric_predicate, text_predicate = self.PAIRWISE_OPERATORS[row["operator"]]
+        return TestCase(
+            api_name, "pairwise",
+            "Pairwise {2} with {3} on {api}.{0} (limit {limit}, offset {offset})",
+            self.PAIRWISE_SHAPES[row["shape"]],
+            (field, numeric_predicate if looks_numeric else text_predicate, row["shape"], row["operator"]),
+            row["page"]
+        )
+    
+    @property
+    def join_graph(self) -> JoinGraph:
+        """Join graph over the schema's shared key fields, built on first use"""
+        if self._join_graph is None:
+            self._join_graph = JoinGraph(self.api_map, field_index=self.field_index)
+        return self._join_graph
+    
+    def iter_join_path_cases(self, depth: int = 2, start: str = None, max_paths: int = None) -> Iterator[TestCase]:
+        """Lazily yield multi-way LEFT JOIN cases for join paths of up to depth joins"""
+        graph = self.join_graph
+        for apis, keys in graph.iter_paths(depth, start, max_paths):
+            route = " -> ".join(f"{api_name} ({key})" for api_name, key in zip(apis[1:], keys))
+            yield TestCase(
+                apis[0], "join_path",
+                f"{len(keys)}-way LEFT JOIN from {apis[0]} -> {route}",
+                graph.path_to_pql(apis, keys),
+                None
+            )
+    
+    def generation_inputs(self, api_name: str) -> Dict[str, Any]:
+        """Everything the per-API generators read for one API: its fields and the partner APIs
+        
+        Used to fingerprint an API so a catalog shard is regenerated only when its inputs change.
+        """
+        partners = []
+        for kind, limit in (("join", 2), ("subquery", 1), ("union", 1)):
+            keys, _ = self.PAIR_KINDS[kind]
+            key = self._first_shared_key(api_name, keys)
+            if key:
+                others = self.get_apis_with_field(key, exclude=api_name, limit=limit)
+                partners.append([kind, key, [[other, self.get_api_fields(other)[0]] for other in others]])
+        return {"fields": list(self.get_api_fields(api_name)), "partners": partners}
+    
+    def load_templates(self, path: str = DEFAULT_TEMPLATES) -> TemplateSet:
+        """Compile a template file against this generator's field classes"""
+        return TemplateSet.from_file(path, [*self.FIELD_CLASSES, "join_key"])
+    
+    def generate_template_cases(self, templates: TemplateSet, apis: Iterable[str] = None) -> Iterator[TestCase]:
+        """Lazily expand compiled templates over the given APIs (default: all)"""
+        return templates.expand(self, apis)
+    
+    def _resolve_categories(self, categories: Iterable[str] = None) -> List[str]:
+        """Validate requested categories and return them in generation order"""
+        if categories is None:
+            return list(self.CATEGORIES)
+        requested = set(categories)
+        unknown = requested - set(self.CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown test case categories: {', '.join(sorted(unknown))}. "
+                             f"Valid categories: {', '.join(self.CATEGORIES)}")
+        return [category for category in self.CATEGORIES if category in requested]
+    
+    def _iter_categorized_cases(self, api_name: str, categories: List[str]) -> Iterator[TestCase]:
+        """Yield an API's test cases for the given categories, one generator at a time"""
+        for category in categories:
+            yield from getattr(self, self.CATEGORIES[category])(api_name)
+    
+    def iter_test_cases(self, api_name: str, categories: Iterable[str] = None) -> Iterator[TestCase]:
+        """Lazily yield test cases for a given API, one at a time"""
         if api_name not in self.api_map:
-            return []
+            return
+        yield from self._iter_categorized_cases(api_name, self._resolve_categories(categories))
+    
+    def iter_catalog(self, apis: Iterable[str] = None, categories: Iterable[str] = None,
+                     dedupe: bool = False) -> Iterator[TestCase]:
+        """Lazily yield test cases across the whole schema
         
-        all_test_cases = []
+        With dedupe, cases whose canonicalized request was already yielded are dropped.
+        """
+        selected = self._resolve_categories(categories)
+        deduplicator = Deduplicator() if dedupe else None
+        for api_name in (self.api_map if apis is None else apis):
+            if api_name not in self.api_map:
+                continue
+            for test_case in self._iter_categorized_cases(api_name, selected):
+                if deduplicator is not None and not deduplicator.add(case_hash(test_case)):
+                    continue
+                yield test_case
+    
+    def get_test_cases(self, api_name: str, categories: Iterable[str] = None, seed: int = None) -> List[TestCase]:
+        """Memoized test suite for an API
         
-        # Generate all types of test cases
-        all_test_cases.extend(self.generate_basic_select_cases(api_name))
-        all_test_cases.extend(self.generate_aggregation_cases(api_name))
-        all_test_cases.extend(self.generate_where_clause_cases(api_name))
-        all_test_cases.extend(self.generate_like_cases(api_name))
-        all_test_cases.extend(self.generate_join_cases(api_name))
-        all_test_cases.extend(self.generate_group_by_having_cases(api_name))
-        all_test_cases.extend(self.generate_subquery_cases(api_name))
-        all_test_cases.extend(self.generate_union_cases(api_name))
+        Suites are cached in a bounded LRU keyed by (api_name, categories, seed,
+        schema hash). With a seed, the API's pairwise sample is appended. The
+        returned list is a fresh copy; the TestCase records are shared with the
+        cache.
+        """
+        selected = tuple(self._resolve_categories(categories))
+        key = (api_name, selected, seed, self.registry.schema_hash)
+        cached = self._case_cache.get(key)
+        if cached is not None:
+            self._case_cache.move_to_end(key)
+            self.cache_hits += 1
+            return list(cached)
         
-        return all_test_cases
+        self.cache_misses += 1
+        test_cases = list(self.iter_test_cases(api_name, selected))
+        if seed is not None and api_name in self.api_map:
+            test_cases.extend(self.generate_pairwise_cases([api_name], seed))
+        self._case_cache[key] = tuple(test_cases)
+        while len(self._case_cache) > self.cache_size:
+            self._case_cache.popitem(last=False)
+        return test_cases
+    
+    def invalidate_cache(self, api_name: str = None):
+        """Drop memoized suites, for one API or all of them"""
+        if api_name is None:
+            self._case_cache.clear()
+            return
+        for key in [key for key in self._case_cache if key[0] == api_name]:
+            del self._case_cache[key]
+    
+    def generate_all_test_cases(self, api_name: str) -> List[TestCase]:
+        """Generate all types of test cases for a given API"""
+        return self.get_test_cases(api_name)
     
     def print_test_cases(self, api_name: str):
         """Print all generated test cases in a formatted way"""
@@ -320,57 +581,640 @@ class PQLTestGenerator:
         output = {
             "api_name": api_name,
             "total_test_cases": len(test_cases),
-            "test_cases": test_cases
+            "test_cases": [test_case.to_dict() for test_case in test_cases]
         }
         
         with open(filename, 'w') as f:
             json.dump(output, f, indent=2)
         
         print(f"✅ Test cases saved to {filename}")
+    
+    def save_catalog_to_jsonl(self, filename: str = "pql_test_cases.jsonl", apis: Iterable[str] = None,
+                              categories: Iterable[str] = None, compress: bool = None) -> int:
+        """Stream the test case catalog to a JSONL file (gzipped if the name ends with .gz)"""
+        written = write_jsonl(self.iter_catalog(apis, categories), filename, compress=compress)
+        print(f"✅ {written} test cases saved to {filename}")
+        return written
+
+def _allocate_budget(totals: List[int], budget: int = None) -> List[int]:
+    """Split a case budget across strata in proportion to their size (largest remainder)"""
+    population = sum(totals)
+    if budget is None or budget >= population:
+        return list(totals)
+    budget = max(0, budget)
+    # Give every stratum one case first when the budget allows it
+    floor = 1 if budget >= len(totals) else 0
+    quotas = [min(floor, total) for total in totals]
+    remaining = budget - sum(quotas)
+    rest = [total - quota for total, quota in zip(totals, quotas)]
+    rest_population = sum(rest)
+    if remaining and rest_population:
+        shares = [remaining * r / rest_population for r in rest]
+        extra = [int(share) for share in shares]
+        leftover = remaining - sum(extra)
+        by_remainder = sorted(range(len(shares)), key=lambda i: shares[i] - extra[i], reverse=True)
+        for i in by_remainder[:leftover]:
+            extra[i] += 1
+        quotas = [quota + e for quota, e in zip(quotas, extra)]
+    return quotas
+
+def _pair_offsets(n: int) -> List[int]:
+    """Rank of the first (i, i+1) pair for each i in lexicographic i<j pair order"""
+    return [i * (2 * n - i - 1) // 2 for i in range(n)]
+
+def pair_plan_report(plan: List[Dict]) -> List[Dict]:
+    """Summarize a pair plan: total, emitted and skipped pairs per (kind, key)"""
+    return [{
+        "kind": stratum["kind"],
+        "key": stratum["key"],
+        "ordered": stratum["ordered"],
+        "total_pairs": stratum["total_pairs"],
+        "emitted": len(stratum["selected"]),
+        "skipped": stratum["skipped"]
+    } for stratum in plan]
+
+# Catalog generation over the full api_data schema
+_worker_generator = None
+
+def _get_worker_generator() -> PQLTestGenerator:
+    """Build the full-schema generator once per worker process"""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = PQLTestGenerator(get_registry())
+    return _worker_generator
+
+def shard_path(shard_dir: str, api_name: str) -> str:
+    """Path of the JSONL shard holding one API's test cases"""
+    return os.path.join(shard_dir, f"{api_name}.jsonl")
+
+def generate_shard(api_names: List[str], categories: List[str], shard_dir: str) -> Dict[str, int]:
+    """Generate and write one shard file per API in the chunk; returns case counts"""
+    generator = _get_worker_generator()
+    counts = {}
+    for api_name in api_names:
+        cases = generator.iter_catalog([api_name], categories)
+        counts[api_name] = write_jsonl(cases, shard_path(shard_dir, api_name))
+    return counts
 
-# Your API Schema
-API_SCHEMA = {
-    "status": "Success",
-    "message": "Success",
-    "items": [
-        {
-            "api_name": "accounts",
-            "api_fields": [
-                "account_number",
-                "account_name",
-                "account_fullname",
-                "description",
-                "account_type",
-                "balance_total",
-                "practice_id"
-            ]
-        },
-        {
-            "api_name": "accounts_receivables",
-            "api_fields": [
-                "write_off_estimate",
-                "payment_plan_amount",
-                "unapplied_payments",
-                "estimated_insurance_amount",
-                "estimated_patient_amount",
-                "guarantor_id",
-                "amount_less_than_30",
-                "amount_between_30_60",
-                "amount_between_60_90",
-                "amount_greater_than_90",
-                "practice_id",
-                "entry_id",
-                "current_date",
-                "cust_id"
-            ]
-        },
-    ]
-}
+def _chunk(items: List[str], n: int) -> List[List[str]]:
+    """Split items into at most n contiguous, near-equal chunks"""
+    n = max(1, min(n, len(items)))
+    size, extra = divmod(len(items), n)
+    chunks, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+def merge_shards(api_names: List[str], shard_dir: str, output: str, deduplicator: Deduplicator = None,
+                 counts: Dict[str, int] = None) -> int:
+    """Concatenate per-API shards into one catalog, in API list order; returns the cases written
+    
+    With a deduplicator, cases whose canonical request was already merged are
+    dropped. Without one, shards are copied whole and ``counts`` (cases per
+    API, when known) avoids recounting their lines.
+    """
+    written = 0
+    with open_catalog(output, "wt") as out:
+        for api_name in api_names:
+            with open(shard_path(shard_dir, api_name), encoding="utf-8") as shard:
+                if deduplicator is None:
+                    shutil.copyfileobj(shard, out)
+                    if counts is not None and api_name in counts:
+                        written += counts[api_name]
+                    else:
+                        shard.seek(0)
+                        written += sum(1 for _ in shard)
+                    continue
+                for line in shard:
+                    if deduplicator.add(case_hash(json.loads(line))):
+                        out.write(line)
+                        written += 1
+    return written
+
+# Modules whose code decides the bytes of a shard: case generation, field
+# classification, TestCase serialization and the JSONL writer. Their content
+# is part of every shard's fingerprint.
+GENERATOR_MODULES = ("testgeneration.py", "schema_registry.py", "schema_cache.py", "test_case.py", "catalog_io.py")
+GENERATOR_VERSION = files_fingerprint([os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                                       for name in GENERATOR_MODULES])
+
+def generate_catalog(output: str, apis: List[str] = None, categories: List[str] = None,
+                     workers: int = None, deduplicator: Deduplicator = None,
+                     full: bool = False) -> Dict[str, Any]:
+    """Generate the test case catalog across a process pool and merge the shards
+
+    APIs are split into contiguous chunks, one per worker. Each worker writes one
+    JSONL shard per API into ``<output>.shards/``; the shards are then merged in
+    schema order so the catalog is identical regardless of worker count.
+
+    A manifest in the shard directory records a fingerprint of each API's
+    generation inputs plus the generator version and categories. Only shards
+    whose fingerprint changed (or all of them, with ``full``) are regenerated.
+    Returns per-API case counts, the number of cases written after dedupe,
+    the regenerated APIs and the schema diff.
+    """
+    generator = _get_worker_generator()
+    categories = generator._resolve_categories(categories)
+    all_apis = apis is None
+    if all_apis:
+        apis = list(generator.api_map)
+    unknown = [api for api in apis if api not in generator.api_map]
+    if unknown:
+        raise ValueError(f"Unknown APIs: {', '.join(unknown)}")
+    
+    shard_dir = output + ".shards"
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = load_manifest(shard_dir)
+    if full or manifest["generator_version"] != GENERATOR_VERSION or manifest["categories"] != categories:
+        manifest = {"generator_version": GENERATOR_VERSION, "categories": categories, "apis": manifest["apis"]}
+        stale = set(apis)
+    else:
+        stale = set()
+    
+    report = {"counts": {}, "regenerated": [], "added_apis": [], "removed_apis": [], "changed_apis": {}}
+    hashes = {}
+    for api_name in apis:
+        inputs = generator.generation_inputs(api_name)
+        hashes[api_name] = fingerprint(inputs)
+        previous = manifest["apis"].get(api_name)
+        if previous is None:
+            report["added_apis"].append(api_name)
+        elif previous["hash"] != hashes[api_name]:
+            changes = diff_fields(previous["fields"], inputs["fields"])
+            report["changed_apis"][api_name] = changes
+        if (previous is None or previous["hash"] != hashes[api_name]
+                or not os.path.exists(shard_path(shard_dir, api_name))):
+            stale.add(api_name)
+    if all_apis:
+        for api_name in [api for api in manifest["apis"] if api not in generator.api_map]:
+            report["removed_apis"].append(api_name)
+            del manifest["apis"][api_name]
+            if os.path.exists(shard_path(shard_dir, api_name)):
+                os.remove(shard_path(shard_dir, api_name))
+    
+    stale_apis = [api for api in apis if api in stale]
+    counts = {}
+    if stale_apis:
+        workers = workers or os.cpu_count() or 1
+        chunks = _chunk(stale_apis, workers)
+        if workers == 1:
+            for chunk in chunks:
+                counts.update(generate_shard(chunk, categories, shard_dir))
+        else:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                for chunk_counts in pool.map(generate_shard, chunks,
+                                             [categories] * len(chunks), [shard_dir] * len(chunks)):
+                    counts.update(chunk_counts)
+    
+    for api_name in stale_apis:
+        manifest["apis"][api_name] = {
+            "hash": hashes[api_name],
+            "fields": list(generator.get_api_fields(api_name)),
+            "cases": counts[api_name]
+        }
+    save_manifest(shard_dir, manifest)
+    
+    report["counts"] = {api: manifest["apis"][api]["cases"] for api in apis}
+    report["written"] = merge_shards(apis, shard_dir, output, deduplicator, report["counts"])
+    report["regenerated"] = stale_apis
+    return report
+
+def _split_list(value: str) -> List[str]:
+    """Parse a comma separated CLI option"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PQL Test Case Generator")
+    parser.add_argument("--catalog", metavar="OUTPUT",
+                        help="Generate the full catalog from api_data.py into a JSONL file (.gz to compress)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for catalog generation (default: CPU count)")
+    parser.add_argument("--full", action="store_true",
+                        help="Regenerate every catalog shard instead of only those whose schema changed")
+    parser.add_argument("--apis", type=_split_list, default=None,
+                        help="Comma separated APIs to include (default: all)")
+    parser.add_argument("--categories", type=_split_list, default=None,
+                        help=f"Comma separated categories (default: all of {', '.join(PQLTestGenerator.CATEGORIES)})")
+    parser.add_argument("--pairs", metavar="OUTPUT",
+                        help="Enumerate JOIN/EXISTS/UNION cases for every API pair sharing a key into a JSONL file")
+    parser.add_argument("--pair-kinds", type=_split_list, default=None,
+                        help=f"Comma separated pair kinds (default: all of {', '.join(PQLTestGenerator.PAIR_KINDS)})")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="Maximum number of pair cases; larger populations are stratified-sampled")
+    parser.add_argument("--pairwise", metavar="OUTPUT",
+                        help="Generate a seeded pairwise (all-pairs) covering suite into a JSONL file")
+    parser.add_argument("--join-paths", metavar="OUTPUT",
+                        help="Enumerate multi-way LEFT JOIN paths over the join graph into a JSONL file")
+    parser.add_argument("--depth", type=int, default=2, help="Maximum joins per join path (default: 2)")
+    parser.add_argument("--max-paths", type=int, default=None, help="Stop join path enumeration after N paths")
+    parser.add_argument("--template-cases", metavar="OUTPUT",
+                        help="Expand a PQL template file over the selected APIs and write JSONL to OUTPUT")
+    parser.add_argument("--templates", metavar="FILE", default=DEFAULT_TEMPLATES,
+                        help="Template file (.json, or .yaml with PyYAML) for --template-cases (default: pql_templates.json)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for sampling")
+    parser.add_argument("--sqlite", metavar="DB",
+                        help="Also bulk-load the generated cases into an indexed SQLite catalog")
+    parser.add_argument("--import", dest="import_files", type=_split_list, default=None, metavar="FILES",
+                        help="Comma-separated case files (JSONL or legacy pql_test_cases*.json) to load into --sqlite")
+    parser.add_argument("--coverage", type=_split_list, default=None, metavar="FILES",
+                        help="Report per-API field coverage of comma-separated case files")
+    parser.add_argument("--minimize", metavar="OUTPUT",
+                        help="With --coverage: write a greedy minimal suite with the same field and category coverage")
+    parser.add_argument("--validate", type=_split_list, default=None, metavar="FILES",
+                        help="Parse and schema-check every case in comma-separated case files")
+    parser.add_argument("--match", metavar="QUERY", default=None,
+                        help="With --run/--validate on a SQLite catalog: only cases whose PQL matches "
+                             "this full-text query (e.g. HAVING)")
+    parser.add_argument("--field", metavar="FIELD", default=None,
+                        help="With --run/--validate on a SQLite catalog: only cases referencing this field")
+    parser.add_argument("--cost", type=_split_list, default=None, metavar="FILES",
+                        help="Estimate the cost of every case in comma-separated case files")
+    parser.add_argument("--cost-output", metavar="OUTPUT",
+                        help="With --cost: write cases cheapest first, annotated with cost and tier")
+    parser.add_argument("--cost-model", metavar="FILE",
+                        help="Cost model weights to load (and to save after --calibrate)")
+    parser.add_argument("--calibrate", type=_split_list, default=None, metavar="RESULTS",
+                        help="Fit the cost model to observed latencies in JSONL result files")
+    parser.add_argument("--slow-threshold", type=float, default=None,
+                        help="Estimated ms above which a case is in the slow tier (default: median)")
+    parser.add_argument("--max-cost", type=float, default=None,
+                        help="With --cost-output: keep the cheapest cases within this total estimated ms")
+    parser.add_argument("--run", type=_split_list, default=None, metavar="FILES",
+                        help="Send every case in comma-separated case files (or SQLite catalogs, "
+                             "filtered by --apis/--categories/--match/--field) to practice_query")
+    parser.add_argument("--results", metavar="OUTPUT", default="pql_results.jsonl",
+                        help="JSONL file for --run results (default: pql_results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight for --run (default: 8)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="With --run: asyncio runner that adapts concurrency to the backend (AIMD)")
+    parser.add_argument("--max-concurrency", type=int, default=64,
+                        help="Upper bound for --async adaptive concurrency (default: 64)")
+    parser.add_argument("--transport", choices=["http1", "http2", "stub"], default="http1",
+                        help="How --run sends requests: pooled HTTP/1.1, multiplexed HTTP/2 (httpx) "
+                             "or an in-process stub with no sockets (default: http1)")
+    responses = parser.add_mutually_exclusive_group()
+    responses.add_argument("--cache", nargs="?", const="pql_response_cache.db", default=None, metavar="DB",
+                           help="With --run: serve repeated requests from a SQLite response cache "
+                                "(default DB: pql_response_cache.db)")
+    responses.add_argument("--record", metavar="CASSETTE", default=None,
+                           help="With --run: record every request and response (with latency) into a cassette")
+    responses.add_argument("--replay", metavar="CASSETTE", default=None,
+                           help="With --run: serve responses from a recorded cassette instead of the endpoint")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="Response cache entry lifetime in seconds")
+    parser.add_argument("--realtime", action="store_true",
+                        help="With --replay: wait each response's recorded latency instead of answering instantly")
+    parser.add_argument("--url", default=None, help="practice_query endpoint for --run")
+    parser.add_argument("--request-key", default=None, help="Request-Key header for --run (default: $PQL_REQUEST_KEY)")
+    parser.add_argument("--stub", action="store_true",
+                        help="With --run: serve responses from a local stub server instead of the real endpoint")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Drop cases whose canonicalized request was already generated")
+    parser.add_argument("--bloom", action="store_true",
+                        help="Deduplicate with a Bloom filter instead of an exact hash set (implies --dedupe)")
+    return parser.parse_args(argv)
+
+def _make_deduplicator(args: argparse.Namespace) -> Deduplicator:
+    """Deduplicator requested on the command line, or None"""
+    if args.bloom or args.dedupe:
+        return Deduplicator(bloom=args.bloom)
+    return None
+
+def _dedupe(test_cases: Iterable[Dict], deduplicator: Deduplicator) -> Iterable[Dict]:
+    return test_cases if deduplicator is None else deduplicator.filter(test_cases)
+
+def _print_duplicates(deduplicator: Deduplicator):
+    if deduplicator is not None:
+        print(f"🧹 {deduplicator.duplicates} duplicate cases dropped")
+
+def run_catalog(args: argparse.Namespace):
+    """CLI mode: sharded catalog generation over all APIs"""
+    print("🚀 PQL Test Case Generator - catalog mode")
+    print("=" * 50)
+    deduplicator = _make_deduplicator(args)
+    try:
+        report = generate_catalog(args.catalog, args.apis, args.categories, args.workers,
+                                  deduplicator, full=args.full)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    if len(report["added_apis"]) > 10:
+        print(f"➕ {len(report['added_apis'])} new APIs")
+    else:
+        for api_name in report["added_apis"]:
+            print(f"➕ New API: {api_name}")
+    for api_name in report["removed_apis"]:
+        print(f"➖ Removed API: {api_name}")
+    for api_name, changes in report["changed_apis"].items():
+        details = [f"+{field}" for field in changes["added_fields"]] + [f"-{field}" for field in changes["removed_fields"]]
+        print(f"✏️ Changed API: {api_name} ({', '.join(details) or 'partner APIs changed'})")
+    counts = report["counts"]
+    print(f"🔄 Regenerated {len(report['regenerated'])} of {len(counts)} API shards")
+    print(f"📊 {report['written']} test cases for {len(counts)} APIs")
+    _print_duplicates(deduplicator)
+    print(f"✅ Catalog saved to {args.catalog}")
+
+def run_pairs(args: argparse.Namespace):
+    """CLI mode: budgeted exhaustive pair enumeration"""
+    print("🚀 PQL Test Case Generator - exhaustive pair mode")
+    print("=" * 50)
+    generator = _get_worker_generator()
+    try:
+        plan = generator.plan_pair_sample(args.budget, args.pair_kinds, args.apis, args.seed)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    deduplicator = _make_deduplicator(args)
+    written = write_jsonl(_dedupe(generator.iter_pair_cases(plan), deduplicator), args.pairs)
+    for row in pair_plan_report(plan):
+        line = f"📊 {row['kind']} on {row['key']}: {row['emitted']}/{row['total_pairs']} pairs"
+        if row["skipped"]:
+            line += f" (⚠️ {row['skipped']} skipped by budget)"
+        print(line)
+    _print_duplicates(deduplicator)
+    print(f"✅ {written} pair cases saved to {args.pairs}")
+
+def run_pairwise(args: argparse.Namespace):
+    """CLI mode: seeded pairwise covering suite"""
+    print("🚀 PQL Test Case Generator - pairwise mode")
+    print("=" * 50)
+    generator = _get_worker_generator()
+    deduplicator = _make_deduplicator(args)
+    written = write_jsonl(_dedupe(generator.generate_pairwise_cases(args.apis, args.seed), deduplicator), args.pairwise)
+    _print_duplicates(deduplicator)
+    print(f"✅ {written} pairwise cases saved to {args.pairwise}")
+
+def run_join_paths(args: argparse.Namespace):
+    """CLI mode: multi-way join path enumeration"""
+    print("🚀 PQL Test Case Generator - join path mode")
+    print("=" * 50)
+    generator = _get_worker_generator()
+    graph = generator.join_graph
+    print(f"📊 Join graph: {len(graph.adjacency)} APIs, {len(graph.keys)} keys, {graph.edge_count()} edges")
+    deduplicator = _make_deduplicator(args)
+    cases = generator.iter_join_path_cases(args.depth, max_paths=args.max_paths)
+    written = write_jsonl(_dedupe(cases, deduplicator), args.join_paths)
+    _print_duplicates(deduplicator)
+    print(f"✅ {written} join path cases saved to {args.join_paths}")
+
+def run_templates(args: argparse.Namespace):
+    """CLI mode: expand user-defined PQL templates"""
+    print("🚀 PQL Test Case Generator - template mode")
+    print("=" * 50)
+    generator = _get_worker_generator()
+    try:
+        templates = generator.load_templates(args.templates)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ {e}")
+    print(f"📋 {len(templates.templates)} templates compiled from {args.templates}")
+    deduplicator = _make_deduplicator(args)
+    cases = generator.generate_template_cases(templates, args.apis)
+    written = write_jsonl(_dedupe(cases, deduplicator), args.template_cases)
+    _print_duplicates(deduplicator)
+    print(f"✅ {written} template cases saved to {args.template_cases}")
+
+def _check_case_filters(filenames: List[str], args: argparse.Namespace):
+    """Fail before any case is read if --match/--field are given for plain case files"""
+    if args.match is None and args.field is None:
+        return
+    plain = [filename for filename in filenames if not is_catalog_db(filename)]
+    if plain:
+        raise SystemExit(f"❌ --match and --field need SQLite catalogs, not {', '.join(plain)}")
+
+def _iter_selected_cases(filenames: List[str], args: argparse.Namespace) -> Iterator[TestCase]:
+    """Cases of --run/--validate sources, restricted by --apis, --categories, --match and --field
+
+    Case files are read whole and filtered by API and category. SQLite
+    catalogs (see --sqlite) are queried with every filter, so a subset such
+    as one API's HAVING cases is read through the indexes and the full-text
+    index instead of scanning the catalog.
+    """
+    apis = set(args.apis) if args.apis else None
+    categories = set(args.categories) if args.categories else None
+    for filename in filenames:
+        if is_catalog_db(filename):
+            with CatalogStore(filename) as store:
+                for api_name in args.apis or [None]:
+                    for category in args.categories or [None]:
+                        yield from store.select(api_name, category, args.field, args.match)
+            continue
+        for test_case in iter_cases(filename):
+            if (apis is None or test_case.api in apis) and (categories is None or test_case.category in categories):
+                yield test_case
+
+def run_validate(args: argparse.Namespace):
+    """CLI mode: parse and schema-check case files without sending anything"""
+    print("🚀 PQL Test Case Generator - validation mode")
+    print("=" * 50)
+    _check_case_filters(args.validate, args)
+    validator = PQLValidator(get_registry())
+    checked = invalid = warned = 0
+    for test_case in _iter_selected_cases(args.validate, args):
+        checked += 1
+        issues = validator.validate(test_case.pql)
+        errors = [issue for issue in issues if issue.severity == "error"]
+        invalid += bool(errors)
+        warned += bool(issues) and not errors
+        if issues and invalid + warned <= 20:
+            print(f"{'❌' if errors else '⚠️'} [{test_case.api}] {test_case.description}")
+            print(f"   {test_case.pql}")
+            for issue in issues:
+                print(f"   {' ' * issue.pos}^ {issue.severity}: {issue}")
+    print(f"📊 {checked} cases checked: {invalid} invalid, {warned} with warnings")
+    if invalid:
+        raise SystemExit(1)
+
+def run_cost(args: argparse.Namespace):
+    """CLI mode: static cost estimation, calibration, tiers and budgeting"""
+    print("🚀 PQL Test Case Generator - cost mode")
+    print("=" * 50)
+    registry = get_registry()
+    if args.cost_model and os.path.exists(args.cost_model):
+        model = CostModel.load(args.cost_model, registry)
+        print(f"📂 Cost model loaded from {args.cost_model} ({model.observations} observations)")
+    else:
+        model = CostModel(registry)
+    if args.calibrate:
+        used = sum(model.calibrate(read_observations(filename)) for filename in args.calibrate)
+        print(f"🎯 Calibrated on {used} observed latencies")
+        if args.cost_model:
+            model.save(args.cost_model)
+            print(f"💾 Cost model saved to {args.cost_model}")
+    if not args.cost:
+        return
+
+    scored = [(test_case, cost) for filename in args.cost for test_case, cost in model.annotate(iter_cases(filename))]
+    tiers = split_tiers(scored, args.slow_threshold)
+    costs = sorted(cost for _, cost in scored if cost is not None)
+    if costs:
+        print(f"📊 {len(scored)} cases: total {sum(costs):,.0f} ms estimated, "
+              f"median {costs[len(costs) // 2]:,.0f} ms, max {costs[-1]:,.0f} ms")
+    print(f"⚡ fast: {len(tiers['fast'])}  🐢 slow: {len(tiers['slow'])}  ❌ unparseable: {len(tiers['invalid'])}")
+    for test_case, cost in sorted(tiers["slow"], key=lambda item: -item[1])[:5]:
+        print(f"   {cost:,.0f} ms  [{test_case.api}] {test_case.description}")
+
+    if args.cost_output:
+        tier_of = {id(test_case): tier for tier, items in tiers.items() for test_case, _ in items}
+        if args.max_cost is not None:
+            selected = within_budget(scored, args.max_cost)
+        else:
+            selected = sorted(scored, key=lambda item: (item[1] is None, item[1] or 0.0))
+        annotated = (dict(as_dict(test_case), cost=cost, tier=tier_of[id(test_case)]) for test_case, cost in selected)
+        written = write_jsonl(annotated, args.cost_output)
+        print(f"✅ {written} cases saved to {args.cost_output}, cheapest first")
+
+def run_batch(args: argparse.Namespace):
+    """CLI mode: execute case files concurrently and record one result line per case"""
+    # Imported here so generation modes work without the HTTP client installed
+    from batch_runner import DEFAULT_URL, BatchRunner, build_headers
+    from pql_stub import StubServer
+    from transports import make_transport
+    
+    print("🚀 PQL Test Case Generator - run mode")
+    print("=" * 50)
+    _check_case_filters(args.run, args)
+    cassette = None
+    if args.record or args.replay:
+        from cassette import Cassette
+        try:
+            cassette = Cassette(args.replay, "r") if args.replay else Cassette(args.record, "a")
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"❌ Cannot open cassette: {e}")
+    stub = StubServer().start() if args.stub and not args.replay else None
+    url = stub.url if stub else (args.url or (cassette and cassette.meta.get("url")) or DEFAULT_URL)
+    
+    def cases():
+        return _iter_selected_cases(args.run, args)
+    
+    pool_size = args.max_concurrency if args.use_async else args.concurrency
+    transport_name = "replay" if args.replay else args.transport
+    if args.replay:
+        from cassette import ReplayTransport
+        transport = ReplayTransport(cassette, realtime=args.realtime)
+        print(f"📼 Replaying {len(cassette)} recorded responses from {args.replay}"
+              f"{' at recorded latency' if args.realtime else ''}")
+    else:
+        try:
+            transport = make_transport(args.transport, pool_size)
+        except ImportError as e:
+            raise SystemExit(f"❌ {e}")
+    if args.record:
+        from cassette import RecordingTransport
+        transport = RecordingTransport(transport, cassette)
+    cache = None
+    if args.cache:
+        from response_cache import CachingTransport, ResponseCache
+        cache = ResponseCache(args.cache, ttl=args.cache_ttl)
+        transport = CachingTransport(transport, cache)
+    try:
+        if args.use_async:
+            from async_runner import AsyncRunner
+            runner = AsyncRunner(url, build_headers(args.request_key), args.concurrency, args.max_concurrency,
+                                 transport=transport)
+            print(f"🌐 POST {url} over {transport_name} with adaptive concurrency "
+                  f"{runner.concurrency}..{runner.max_concurrency}")
+            summary = runner.run(cases(), args.results)
+        else:
+            with BatchRunner(url, build_headers(args.request_key), args.concurrency, transport=transport) as runner:
+                print(f"🌐 POST {url} over {transport_name} with {runner.concurrency} concurrent requests")
+                summary = runner.run(cases(), args.results)
+    finally:
+        if stub:
+            stub.stop()
+    _print_run_summary(summary, args.results)
+    if cache:
+        stats = cache.stats()
+        print(f"🗃️ Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+              f"{stats['entries']} entries in {args.cache}")
+    if args.record:
+        print(f"📼 {len(cassette)} responses recorded to {args.record} ({os.path.getsize(args.record):,} bytes)")
+
+def _print_run_summary(summary: Dict[str, Any], output: str):
+    statuses = ", ".join(f"{status}: {n}" for status, n in sorted(summary["status_counts"].items(), key=str))
+    print(f"📊 {summary['cases']} cases in {summary['elapsed_s']} s ({summary['throughput_rps']} req/s), "
+          f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms")
+    print(f"   {summary['succeeded']} succeeded, {summary['failed']} failed ({statuses})")
+    if "concurrency" in summary:
+        concurrency = summary["concurrency"]
+        print(f"   Concurrency settled at {concurrency['final']} (peak {concurrency['peak']}, "
+              f"{concurrency['decreases']} backoffs)")
+    print(f"✅ Results saved to {output}")
+
+def _print_coverage(coverage: FieldCoverage, label: str):
+    covered, total = coverage.totals()
+    full = sum(1 for row in coverage.report().values() if row["covered"] == row["total"])
+    print(f"📊 {label}: {coverage.cases} cases cover {covered}/{total} fields "
+          f"({100.0 * covered / total if total else 100.0:.1f}%), {full}/{len(coverage.covered)} APIs fully covered")
+
+def run_coverage(args: argparse.Namespace):
+    """CLI mode: field coverage report and optional greedy suite minimization"""
+    print("🚀 PQL Test Case Generator - coverage mode")
+    print("=" * 50)
+    registry = get_registry()
+
+    def cases():
+        for filename in args.coverage:
+            yield from iter_cases(filename)
+
+    coverage = FieldCoverage(registry).update(cases())
+    _print_coverage(coverage, "Suite")
+    partial = {api_name: row for api_name, row in coverage.report().items()
+               if row["missing_fields"] and (args.apis is None or api_name in args.apis)}
+    if len(partial) > 10 and args.apis is None:
+        print(f"   {len(partial)} APIs with missing fields (use --apis to list them)")
+    else:
+        for api_name, row in partial.items():
+            print(f"   {api_name}: {row['covered']}/{row['total']} fields, "
+                  f"missing {', '.join(row['missing_fields'])}")
+    if args.minimize:
+        suite = minimize_suite(cases(), registry)
+        write_jsonl(suite, args.minimize)
+        _print_coverage(FieldCoverage(registry).update(suite), "Minimized")
+        print(f"✅ {len(suite)} cases saved to {args.minimize}")
+
+def store_outputs(db_path: str, outputs: List[str]):
+    """Bulk-load case files (any format iter_cases reads) into the SQLite catalog, one transaction per file"""
+    with CatalogStore(db_path) as store:
+        for output in outputs:
+            inserted = store.add_cases(iter_cases(output))
+            print(f"🗄️ {inserted} new cases from {output} stored in {db_path}")
+        print(f"📊 {store.count()} cases in catalog {db_path}")
 
 # Usage Example
-def main():
-    # Initialize the test generator
-    generator = PQLTestGenerator(API_SCHEMA)
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    if args.catalog or args.pairs or args.pairwise or args.join_paths or args.template_cases:
+        if args.catalog:
+            run_catalog(args)
+        if args.pairs:
+            run_pairs(args)
+        if args.pairwise:
+            run_pairwise(args)
+        if args.join_paths:
+            run_join_paths(args)
+        if args.template_cases:
+            run_templates(args)
+        if args.sqlite:
+            outputs = [args.catalog, args.pairs, args.pairwise, args.join_paths, args.template_cases]
+            store_outputs(args.sqlite, [output for output in outputs if output])
+        return
+    if args.run:
+        run_batch(args)
+        return
+    if args.cost or args.calibrate:
+        run_cost(args)
+        return
+    if args.validate:
+        run_validate(args)
+        return
+    if args.coverage:
+        run_coverage(args)
+        return
+    if args.import_files:
+        store_outputs(args.sqlite or DEFAULT_DB, args.import_files)
+        return
+    
+    # Initialize the test generator from the shared schema registry
+    generator = PQLTestGenerator(get_registry())
     
     # Generate test cases for accounts_receivables API
     api_name = "accounts_receivables"
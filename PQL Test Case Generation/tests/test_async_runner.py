@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from async_runner import AIMDLimiter, AsyncRunner
+from pql_stub import stub_handler
+from test_case import TestCase as Case
+from transports import Transport, TransportResponse
+
+
+class CappedTransport(Transport):
+    """Stub backend that answers 429 while more than ``capacity`` requests are in flight"""
+    name = "capped"
+
+    def __init__(self, capacity, latency=0.002):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def apost(self, url, headers, body, timeout=30):
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency)
+            if self.in_flight > self.capacity:
+                self.rejected += 1
+                return TransportResponse(429, {}, json.dumps({"short_message": "Too Many Requests"}))
+            status, payload = stub_handler(body)
+            return TransportResponse(status, {}, json.dumps(payload))
+        finally:
+            self.in_flight -= 1
+
+
+def make_cases(n):
+    return [Case("accounts", "basic_select", f"Case {i}",
+                 f"SELECT [accounts.account_number] FROM [accounts] WHERE [accounts.balance_total] > {i}", None)
+            for i in range(n)]
+
+
+def test_backs_off_to_backend_capacity(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    transport = CappedTransport(capacity=8)
+    runner = AsyncRunner("http://stub", {}, concurrency=32, max_concurrency=64, transport=transport)
+    summary = runner.run(make_cases(600), output)
+
+    with open(output) as f:
+        results = [json.loads(line) for line in f]
+    assert sorted(result["index"] for result in results) == list(range(600))
+    assert summary["concurrency"]["decreases"] >= 1
+    # Starting at 4x the capacity, the limit is cut down and then hovers around it
+    assert summary["concurrency"]["final"] <= 2 * transport.capacity
+    assert transport.rejected == summary["status_counts"][429]
+    assert transport.rejected < 600 // 4
+
+
+def test_one_decrease_per_round_trip():
+    async def scenario():
+        limiter = AIMDLimiter(initial=16, maximum=64)
+        sent = [await limiter.acquire() for _ in range(4)]
+        # Every request of the window is rejected; only the first cuts the limit
+        for sent_at in sent:
+            await limiter.release(sent_at, 429, 1.0)
+        assert limiter.limit == 8 and limiter.decreases == 1
+        # A request sent after the decrease may cut it again
+        await limiter.release(await limiter.acquire(), 503, 1.0)
+        assert limiter.limit == 4 and limiter.decreases == 2
+
+    asyncio.run(scenario())
+
+
+def test_healthy_responses_grow_the_limit_additively():
+    async def scenario():
+        limiter = AIMDLimiter(initial=4, maximum=64)
+        for _ in range(8):
+            await limiter.release(await limiter.acquire(), 200, 1.0)
+        # About one step per window of ``limit`` responses: 4 + 8 / ~5
+        assert 5 < limiter.limit < 6.5
+
+    asyncio.run(scenario())
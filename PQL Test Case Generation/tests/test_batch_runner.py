@@ -0,0 +1,71 @@
+import json
+
+from batch_runner import BatchRunner
+from pql_stub import StubServer, stub_handler
+from test_case import TestCase as Case
+from transports import StubTransport, TransportError, make_transport
+
+
+def make_cases(n):
+    return [Case("accounts", "basic_select", f"Case {i}",
+                 f"SELECT [accounts.account_number] FROM [accounts] WHERE [accounts.balance_total] > {i}", None)
+            for i in range(n)]
+
+
+def read_results(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_one_result_line_per_case(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    runner = BatchRunner("http://stub", {}, concurrency=4, transport=StubTransport(4))
+    summary = runner.run(make_cases(50), output)
+    runner.close()
+
+    results = read_results(output)
+    assert summary["cases"] == 50
+    assert sorted(result["index"] for result in results) == list(range(50))
+    assert all(result["success"] and result["status_code"] == 200 for result in results)
+
+
+def test_errors_are_recorded_per_case(tmp_path):
+    def handler(body):
+        case = int(body["pql"].rsplit(" ", 1)[1])
+        if case % 5 == 1:
+            raise TransportError("connection reset")
+        if case % 5 == 2:
+            raise RuntimeError("transport bug")
+        if case % 5 == 3:
+            return 429, {"short_message": "Too Many Requests"}
+        return stub_handler(body)
+
+    output = str(tmp_path / "results.jsonl")
+    runner = BatchRunner("http://stub", {}, concurrency=4, transport=StubTransport(4, handler=handler))
+    summary = runner.run(make_cases(20), output)
+    runner.close()
+
+    results = {result["index"]: result for result in read_results(output)}
+    assert sorted(results) == list(range(20))
+    assert summary["succeeded"] == 8 and summary["failed"] == 12
+    for index, result in results.items():
+        kind = index % 5
+        if kind == 1:
+            assert result["status_code"] is None and result["error"] == "connection reset"
+        elif kind == 2:
+            assert result["status_code"] is None and result["error"] == "RuntimeError: transport bug"
+        elif kind == 3:
+            assert result["status_code"] == 429 and result["error"] == "Too Many Requests"
+        else:
+            assert result["success"] and result["error"] is None
+
+
+def test_runs_against_stub_server(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    with StubServer() as server:
+        runner = BatchRunner(server.url, {}, concurrency=4, transport=make_transport("http1", 4))
+        summary = runner.run(make_cases(12), output)
+        runner.close()
+    assert server.requests == 12
+    assert summary["succeeded"] == 12
+    assert len(read_results(output)) == 12
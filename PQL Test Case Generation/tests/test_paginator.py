@@ -0,0 +1,63 @@
+import pytest
+
+from paginator import PageError, iter_items, iter_pages
+from transports import StubTransport
+
+PQL = "SELECT [accounts.account_number] FROM [accounts]"
+
+
+def capped_handler(page_cap, total_count, drop_at=None):
+    """practice_query stand-in with ``total_count`` rows that sends at most ``page_cap`` per page"""
+    def handler(body):
+        limit, offset = int(body["limit"]), int(body["offset"])
+        rows = max(0, min(limit, page_cap, total_count - offset))
+        items = [{"account_number": f"account_number_{offset + row}"} for row in range(rows)]
+        if offset == drop_at:
+            items.pop()
+        return 200, {"offset": body["offset"], "limit": body["limit"], "total_count": str(total_count),
+                     "execution_time": "0", "pagination": {}, "items": items}
+    return handler
+
+
+def expected_rows(total_count):
+    return [{"account_number": f"account_number_{row}"} for row in range(total_count)]
+
+
+@pytest.mark.parametrize("prefetch", [1, 4])
+def test_every_row_despite_page_cap(prefetch):
+    # The body asks for 50 rows per page; the server sends 7
+    transport = StubTransport(handler=capped_handler(7, total_count=100))
+    body = {"pql": PQL, "limit": "50", "offset": "0"}
+    rows = list(iter_items(transport, "http://stub", {}, body, prefetch=prefetch))
+    assert rows == expected_rows(100)
+    assert transport.requests == 15
+
+
+def test_unknown_total_reads_until_a_short_page():
+    def handler(body):
+        status, payload = capped_handler(7, total_count=30)(body)
+        del payload["total_count"]
+        return status, payload
+
+    transport = StubTransport(handler=handler)
+    rows = list(iter_items(transport, "http://stub", {}, {"pql": PQL, "limit": "50", "offset": "0"}))
+    assert rows == expected_rows(30)
+
+
+def test_short_page_raises_instead_of_skipping_rows():
+    transport = StubTransport(handler=capped_handler(7, total_count=100, drop_at=21))
+    pages = iter_pages(transport, "http://stub", {}, {"pql": PQL, "limit": "50", "offset": "0"}, prefetch=2)
+    with pytest.raises(PageError) as error:
+        list(pages)
+    assert error.value.offset == 21
+
+
+def test_failed_page_raises_with_status():
+    def handler(body):
+        if int(body["offset"]) == 14:
+            return 500, {"short_message": "Internal Server Error"}
+        return capped_handler(7, total_count=100)(body)
+
+    with pytest.raises(PageError) as error:
+        list(iter_items(StubTransport(handler=handler), "http://stub", {}, {"pql": PQL, "limit": "50", "offset": "0"}))
+    assert error.value.offset == 14 and error.value.status_code == 500
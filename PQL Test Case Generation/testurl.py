@@ -1,5 +1,7 @@
 import requests
 import json
+import sys
+import time
 
 # Simple version - just show the raw response
 url = "https://api.sikkasoft.com/v4/practice_query"
@@ -14,6 +16,21 @@ data = {
     "offset": "0"
 }
 
+# python testurl.py --all: pull every page instead of just the first one
+if "--all" in sys.argv:
+    from paginator import iter_pages
+    from transports import make_transport
+
+    prefetch = 8
+    start = time.perf_counter()
+    rows = 0
+    with make_transport("http1", pool_size=prefetch) as transport:
+        for page in iter_pages(transport, url, headers, data, prefetch=prefetch):
+            rows += len(page["items"])
+            print(f"offset {page.get('offset')}: {len(page['items'])} items ({rows}/{page.get('total_count')})")
+    print(f"Fetched {rows} items in {time.perf_counter() - start:.2f} s")
+    sys.exit(0)
+
 response = requests.post(url, headers=headers, json=data)
 
 print("Status Code:", response.status_code)
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pql_stub import stub_handler
+
+try:
+    import httpx
+except ImportError:  # Only the HTTP/2 transport needs httpx (installed with its h2 extra)
+    httpx = None
+
+
+class TransportError(Exception):
+    """The request could not be completed (connection, TLS, timeout, ...)"""
+
+
+class TransportResponse:
+    """Minimal response shared by every transport"""
+    __slots__ = ("status_code", "headers", "text")
+
+    def __init__(self, status_code: int, headers: Dict[str, str], text: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class Transport:
+    """Sends one practice_query POST; implementations differ only in how bytes reach the server
+
+    ``apost`` is the asyncio entry point. The default runs ``post`` on the
+    loop's executor; transports with a native async client override it.
+    """
+    name = "base"
+
+    def post(self, url: str, headers: Dict[str, str], body: Dict[str, Any], timeout: float = 30) -> TransportResponse:
+        raise NotImplementedError
+
+    async def apost(self, url: str, headers: Dict[str, str], body: Dict[str, Any],
+                    timeout: float = 30) -> TransportResponse:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.post(url, headers, body, timeout))
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """Session whose connection pool holds ``pool_size`` keep-alive connections to the endpoint
+
+    ``pool_block`` makes extra threads wait for a free connection instead of
+    opening (and then discarding) one-off connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HTTP1Transport(Transport):
+    """HTTP/1.1 over a pooled requests.Session: one request per keep-alive connection at a time"""
+    name = "http1"
+
+    def __init__(self, pool_size: int = 8):
+        self.session = make_session(pool_size)
+
+    def post(self, url, headers, body, timeout=30):
+        try:
+            response = self.session.post(url, headers=headers, json=body, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, dict(response.headers), response.text)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """HTTP/2 via httpx: concurrent requests are multiplexed as streams on one connection"""
+    name = "http2"
+
+    def __init__(self, pool_size: int = 8):
+        if httpx is None:
+            raise ImportError("The http2 transport needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.Client(http2=True, limits=self.limits)
+        self._async_client = None
+
+    def post(self, url, headers, body, timeout=30):
+        try:
+            response = self.client.post(url, headers=headers, json=body, timeout=timeout)
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, dict(response.headers), response.text)
+
+    async def apost(self, url, headers, body, timeout=30):
+        if self._async_client is None:
+            # Created on first use so it binds to the running event loop
+            self._async_client = httpx.AsyncClient(http2=True, limits=self.limits)
+        try:
+            response = await self._async_client.post(url, headers=headers, json=body, timeout=timeout)
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, dict(response.headers), response.text)
+
+    def close(self):
+        self.client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+
+class StubTransport(Transport):
+    """Calls a Python handler in-process: no sockets, no network, deterministic results
+
+    ``handler`` takes the request body and returns (status, JSON payload);
+    ``latency`` (seconds) simulates a fixed server time. The URL is ignored.
+    """
+    name = "stub"
+
+    def __init__(self, pool_size: int = 8,
+                 handler: Callable[[Dict[str, Any]], Tuple[int, Dict[str, Any]]] = stub_handler,
+                 latency: float = 0.0):
+        self.handler = handler
+        self.latency = latency
+        self.requests = 0
+
+    def _respond(self, body: Dict[str, Any]) -> TransportResponse:
+        # Round-trip the body through JSON like a real server would see it
+        status, payload = self.handler(json.loads(json.dumps(body)))
+        self.requests += 1
+        return TransportResponse(status, {"Content-Type": "application/json"}, json.dumps(payload))
+
+    def post(self, url, headers, body, timeout=30):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(body)
+
+    async def apost(self, url, headers, body, timeout=30):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(body)
+
+
+TRANSPORTS = {transport.name: transport for transport in (HTTP1Transport, HTTP2Transport, StubTransport)}
+
+
+def make_transport(name: str = "http1", pool_size: int = 8) -> Transport:
+    """Transport by name: http1 (pooled requests.Session), http2 (httpx) or stub (in-process)"""
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {name!r}; choose from {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[name](pool_size)